@@ -0,0 +1,424 @@
+#benchmark.py
+# Offline benchmark of the team orchestration:
+#   python benchmark.py                      # every phase: recon, vuln, exploit, pentest
+#   python benchmark.py recon exploit --delay 0.2
+#   python benchmark.py --delay 0            # smoke run: every phase should finish with an empty error column
+# Each phase runs in its own interpreter inside a temporary workspace, against a mock
+# OpenAI-compatible endpoint replaying SCRIPTS, a local DVWA stand-in serving the
+# url_dvwa.txt paths, and fake scanner binaries that emit the recorded pentest_results.
+import argparse
+import importlib
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(REPO_DIR, "pentest_results")
+REPORT_DIR = "pentest_results/reports"
+PHASES = ("recon", "vuln", "exploit", "pentest")
+TEAM_MODULES = {"recon": "recon_team", "vuln": "vuln_team", "exploit": "exploit_team", "pentest": "main"}
+FAKE_TOOLS = ("nmap", "whatweb", "gobuster", "hakrawler", "nuclei", "sqlmap", "curl")
+TOOL_DELAY = 0.0
+DEFAULT_SPEAKER = "User-Proxy"
+
+
+def _call(name, **arguments):
+    return {"tool_calls": [{"name": name, "arguments": arguments}]}
+
+
+def _bash(command):
+    return f"```bash\n{command}\n```"
+
+
+NMAP = "nmap -sV -p {port} {host} -oN pentest_results/recon/nmap_scan.txt"
+WHATWEB = "whatweb -a 3 {url} > pentest_results/recon/whatweb_scan.txt"
+GOBUSTER = "gobuster dir -u {url} -w wordlist.txt -o pentest_results/recon/gobuster_scan.txt"
+NUCLEI = "nuclei -u {url}/vulnerabilities/sqli/?id=1 -o pentest_results/vulnscan/nuclei_sqli.txt"
+SQLMAP = "sqlmap -u '{url}/vulnerabilities/sqli/?id=1&Submit=Submit' --batch --current-user > pentest_results/exploit/exploit_sqli_sqli.txt"
+BATCH = _call("run_scan_batch", commands=[
+    {"name": "nmap", "command": NMAP},
+    {"name": "whatweb", "command": WHATWEB},
+    {"name": "gobuster", "command": GOBUSTER},
+])
+
+# Recorded completions per agent, replayed in order; {url}/{host}/{port} point at the DVWA stand-in.
+SCRIPTS = {
+    "recon": {
+        "File-Reader": [_call("read_file", file_name="header.txt", base_dir="."), "Cookie loaded: PHPSESSID and security=low."],
+        "Nmap-Agent": [_bash(NMAP)],
+        "WhatWeb-Agent": [_bash(WHATWEB)],
+        "Directory-Scanner": [_bash(GOBUSTER)],
+        "Code-Checker": [BATCH, "All recon scans finished."],
+        "Report-Writer": [_call("save_report", report_text="Target: {host}:{port}\nApache/PHP DVWA.", filename="recon_report.txt"),
+                          "TERMINATE"],
+    },
+    "vuln": {
+        "Param-URL-Extractor": [_call("analyze_forms_and_capture_urls", urls=["url_dvwa.txt"], base_url="{url}"),
+                                "Parameterized URLs saved to captured_urls.txt."],
+        "File-Reader": [_call("read_file", file_name="recon_report.txt", base_dir="pentest_results/reports"),
+                        "Recon: Apache, PHP, DVWA login.",
+                        _call("read_findings", kind="vuln"), "Nuclei reported the findings above."],
+        "Nuclei-Scanner": [_bash(NUCLEI)],
+        "Report-Writer": [_call("saving-report", report_text="Target: {host}:{port}\nnuclei findings.", filename="vuln_scan_report.txt"),
+                          "TERMINATE"],
+    },
+    "exploit": {
+        "File-Reader": [_call("read_file", file_name="vuln_scan_report.txt", base_dir="pentest_results/reports"),
+                        "SQL injection on /vulnerabilities/sqli/?id=.",
+                        _call("read_file", file_name="exploit_sqli_sqli.txt", base_dir="pentest_results/exploit"),
+                        "sqlmap confirmed the injection."],
+        "Exploit-Agent": [_bash(SQLMAP)],
+        "Exploit-Checker": [_bash(SQLMAP)],
+        "Report-Writer": [_call("saving-report", report_text="Target: {host}:{port}\nSQLi confirmed.", filename="exploit_report.txt"),
+                          "TERMINATE"],
+    },
+}
+SCRIPTS["pentest"] = {
+    "File-Reader": SCRIPTS["recon"]["File-Reader"] + SCRIPTS["vuln"]["File-Reader"][2:] + SCRIPTS["exploit"]["File-Reader"][2:],
+    "Nmap-Agent": SCRIPTS["recon"]["Nmap-Agent"],
+    "WhatWeb-Agent": SCRIPTS["recon"]["WhatWeb-Agent"],
+    "Directory-Scanner": SCRIPTS["recon"]["Directory-Scanner"],
+    "Code-Checker": SCRIPTS["recon"]["Code-Checker"] + [_bash(SQLMAP)],
+    "Param-URL-Extractor": SCRIPTS["vuln"]["Param-URL-Extractor"],
+    "Nuclei-Scanner": SCRIPTS["vuln"]["Nuclei-Scanner"],
+    "Exploit-Agent": SCRIPTS["exploit"]["Exploit-Agent"],
+    "Report-Writer": [
+        SCRIPTS["recon"]["Report-Writer"][0], "Recon report saved.",
+        _call("save_report", report_text="Target: {host}:{port}\nnuclei findings.", filename="vuln_scan_report.txt"), "Vuln report saved.",
+        _call("save_report", report_text="Target: {host}:{port}\nSQLi confirmed.", filename="exploit_report.txt"), "TERMINATE",
+    ],
+}
+SEEDS = {
+    "recon": "Read header.txt with File-Reader, then run recon. The URL is : {url}",
+    "vuln": "The target base URL is {url}. Extract parameterized URLs and scan them.",
+    "exploit": "Exploit the findings in pentest_results/reports/vuln_scan_report.txt. The URL is : {url}",
+    "pentest": "Please start by reading header.txt using File-Reader to retrieve the cookie. The URL is : {url}",
+}
+
+
+# --- mock LLM ------------------------------------------------------------------
+
+def _fill(value, params):
+    if isinstance(value, str):
+        for key, v in params.items():
+            value = value.replace("{" + key + "}", str(v))
+        return value
+    if isinstance(value, list):
+        return [_fill(v, params) for v in value]
+    if isinstance(value, dict):
+        return {k: _fill(v, params) for k, v in value.items()}
+    return value
+
+
+class ScriptedLLM:
+    """Per-agent queues of completions; the agent is recognised by its system message."""
+
+    def __init__(self, script, params):
+        self.queues = {name: list(_fill(items, params)) for name, items in script.items()}
+        self.agents_by_system = {}
+        self.requests = 0
+        self.unscripted = 0
+        self._lock = threading.Lock()
+
+    def register_agents(self, agents):
+        for agent in agents:
+            if getattr(agent, "llm_config", False):
+                self.agents_by_system[agent.system_message] = agent.name
+
+    def complete(self, body):
+        messages = body.get("messages") or []
+        system = messages[0].get("content") if messages and messages[0].get("role") == "system" else ""
+        with self._lock:
+            self.requests += 1
+            name = self.agents_by_system.get(system)
+            queue = self.queues.get(name) or []
+            if queue:
+                return queue.pop(0)
+            self.unscripted += 1
+            # Speaker selection by the manager or an agent speaking beyond its script.
+            return DEFAULT_SPEAKER if name is None else "Done."
+
+    def response(self, body):
+        reply = self.complete(body)
+        message, finish = {"role": "assistant", "content": None}, "stop"
+        if isinstance(reply, dict):
+            message["tool_calls"] = [
+                {"id": f"call_{self.requests}_{i}", "type": "function",
+                 "function": {"name": call["name"], "arguments": json.dumps(call["arguments"])}}
+                for i, call in enumerate(reply["tool_calls"])
+            ]
+            finish = "tool_calls"
+        else:
+            message["content"] = reply
+        prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+        completion_tokens = len(json.dumps(message)) // 4
+        return {
+            "id": f"mock-{self.requests}", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish, "logprobs": None}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+
+def _serve(handler_cls):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_cls)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_mock_llm(llm):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            data = json.dumps(llm.response(body)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    return _serve(Handler)
+
+
+# --- DVWA stand-in ---------------------------------------------------------------
+
+LOGIN_PAGE = """<html><body><form action="login.php" method="post">
+<input type="text" name="username"><input type="password" name="password">
+<input type="hidden" name="user_token" value="0123456789abcdef"><input type="submit" name="Login" value="Login">
+</form></body></html>"""
+FORM_PAGE = """<html><body><h1>{path}</h1><form action="#" method="GET">
+<input type="text" name="id"><input type="submit" name="Submit" value="Submit"></form></body></html>"""
+
+
+def start_dvwa(paths):
+    known = {p.rstrip("/") or "/" for p in paths} | {"/"}
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body=b"", headers=()):
+            self.send_response(status)
+            for key, value in headers:
+                self.send_header(key, value)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = urlparse(self.path).path.rstrip("/") or "/"
+            if path == "/login.php":
+                self._send(200, LOGIN_PAGE.encode())
+            elif path in known:
+                self._send(200, FORM_PAGE.format(path=path).encode(), [("Server", "Apache/2.4.25 (Debian)")])
+            else:
+                self._send(404, b"Not Found")
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            parse_qs(self.rfile.read(length).decode())
+            self._send(302, b"", [("Location", "/index.php"), ("Set-Cookie", "PHPSESSID=benchmark; path=/")])
+
+        def log_message(self, *args):
+            pass
+
+    return _serve(Handler)
+
+
+# --- fake tool binaries ----------------------------------------------------------
+
+FAKE_TOOL = """#!{python}
+import os, sys, time
+FIXTURES = {fixtures!r}
+DELAY = {delay!r}
+tool = os.path.basename(sys.argv[0])
+args = sys.argv[1:]
+if args[:1] in (["--version"], ["-version"], ["version"]):
+    print(tool + " benchmark-stub")
+    sys.exit(0)
+out = None
+for flag in ("-oN", "-o", "--output", "-output"):
+    if flag in args and args.index(flag) + 1 < len(args):
+        out = args[args.index(flag) + 1]
+recorded, candidates = None, []
+for sub in ("recon", "vulnscan", "exploit"):
+    base = os.path.join(FIXTURES, sub)
+    for name in sorted(os.listdir(base)) if os.path.isdir(base) else []:
+        candidates.append((name, os.path.join(base, name)))
+prefix = "exploit_" if tool in ("sqlmap", "curl") else tool + "_"
+target_name = os.path.basename(out) if out else ""
+for name, path in candidates:
+    if name == target_name:
+        recorded = path
+if recorded is None:
+    recorded = next((path for name, path in candidates if name.startswith(prefix)), None)
+data = open(recorded, encoding="utf-8", errors="replace").read() if recorded else ""
+time.sleep(DELAY)
+if out:
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        f.write(data)
+else:
+    sys.stdout.write(data)
+"""
+
+
+def install_fake_tools(bin_dir, delay=TOOL_DELAY):
+    os.makedirs(bin_dir, exist_ok=True)
+    script = FAKE_TOOL.format(python=sys.executable, fixtures=FIXTURES_DIR, delay=delay)
+    for tool in FAKE_TOOLS:
+        path = os.path.join(bin_dir, tool)
+        with open(path, "w") as f:
+            f.write(script)
+        os.chmod(path, 0o755)
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+
+
+# --- phases ----------------------------------------------------------------------
+
+def prepare_workspace(workspace):
+    for name in ("header.txt", "url_dvwa.txt"):
+        shutil.copy2(os.path.join(REPO_DIR, name), os.path.join(workspace, name))
+    # Later phases read the earlier phases' reports.
+    shutil.copytree(os.path.join(FIXTURES_DIR, "reports"), os.path.join(workspace, REPORT_DIR), dirs_exist_ok=True)
+    for sub in ("recon", "vulnscan", "exploit"):
+        os.makedirs(os.path.join(workspace, "pentest_results", sub), exist_ok=True)
+    with open(os.path.join(workspace, "wordlist.txt"), "w") as f:
+        f.write("admin\nlogin.php\nsetup.php\n")
+
+
+def build_team(phase, llm_config):
+    if phase == "recon":
+        from recon_team import create_recon_team
+        return create_recon_team(llm_config, "NEVER")
+    if phase == "vuln":
+        from vuln_team import create_vuln_team
+        return create_vuln_team(llm_config, "NEVER")
+    if phase == "exploit":
+        from exploit_team import create_exploit_team
+        return create_exploit_team(llm_config, "NEVER")
+    from main import pentest_team
+    return pentest_team(llm_config, interaction_mode="NEVER")
+
+
+def run_phase(phase, delay=TOOL_DELAY):
+    """Run one phase in the current process (inside a fresh workspace) and return its metrics."""
+    workspace = tempfile.mkdtemp(prefix=f"bench_{phase}_")
+    prepare_workspace(workspace)
+    os.chdir(workspace)
+    sys.path.insert(0, REPO_DIR)
+    install_fake_tools(os.path.join(workspace, "bin"), delay)
+
+    with open("url_dvwa.txt") as f:
+        dvwa = start_dvwa([line.strip() for line in f if line.strip()])
+    host, port = dvwa.server_address
+    params = {"host": host, "port": port, "url": f"http://{host}:{port}"}
+    llm = ScriptedLLM(SCRIPTS[phase], params)
+    mock = start_mock_llm(llm)
+    llm_config = {
+        "config_list": [{"model": "mock-llm", "api_key": "offline", "price": [0.0, 0.0],
+                         "base_url": f"http://127.0.0.1:{mock.server_address[1]}/v1"}],
+        "cache_seed": None,
+        "temperature": 0,
+    }
+
+    start = time.perf_counter()
+    importlib.import_module(TEAM_MODULES[phase])
+    imported = time.perf_counter()
+    # Offline run: never wait on tiktoken's encoding download inside the measured chat.
+    import history_compaction
+    history_compaction.USE_TIKTOKEN = False
+    team = build_team(phase, llm_config)
+    built = time.perf_counter()
+    llm.register_agents(list(team["team"].agents) + [team["manager"]])
+    for agent in team["team"].agents:
+        # Some reporters are hard-wired to ALWAYS ask a human; nobody answers in a benchmark.
+        agent.human_input_mode = "NEVER"
+    error = ""
+    try:
+        team["user_proxy"].initiate_chat(team["manager"], message=_fill(SEEDS[phase], params))
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finished = time.perf_counter()
+    from lazy_agents import CLIENT_BUILD_SECONDS
+    dvwa.shutdown()
+    mock.shutdown()
+    return {
+        "phase": phase,
+        "rounds": len(team["team"].messages),
+        "llm_requests": llm.requests,
+        "unscripted": llm.unscripted,
+        "import_s": round(imported - start, 3),
+        "build_s": round(built - imported, 3),
+        "client_s": round(sum(CLIENT_BUILD_SECONDS.values()), 3),
+        "clients": len(CLIENT_BUILD_SECONDS),
+        "run_s": round(finished - built, 3),
+        "wall_s": round(finished - start, 3),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "error": error,
+        "workspace": workspace,
+    }
+
+
+def run_benchmark(phases=PHASES, delay=TOOL_DELAY):
+    """Each phase in a fresh interpreter so start-up and memory are measured in isolation."""
+    results = []
+    for phase in phases:
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", phase, "--delay", str(delay)],
+                              capture_output=True, text=True, stdin=subprocess.DEVNULL)
+        lines = [l for l in proc.stdout.splitlines() if l.startswith("BENCH ")]
+        if lines:
+            result = json.loads(lines[-1][len("BENCH "):])
+        else:
+            result = {"phase": phase, "error": (proc.stderr.strip().splitlines() or ["no result"])[-1]}
+        result["process_s"] = round(time.perf_counter() - start, 3)
+        results.append(result)
+    return results
+
+
+def format_results(results):
+    lines = [f"{'phase':<8} {'rounds':>6} {'llm':>5} {'unscr':>5} {'import_s':>8} {'build_s':>8} {'clients':>7} "
+             f"{'run_s':>8} {'process_s':>9} {'rss_mb':>7}  error"]
+    for r in results:
+        lines.append(f"{r['phase']:<8} {r.get('rounds', '-'):>6} {r.get('llm_requests', '-'):>5} {r.get('unscripted', '-'):>5} "
+                     f"{r.get('import_s', '-'):>8} {r.get('build_s', '-'):>8} {r.get('clients', '-'):>7} "
+                     f"{r.get('run_s', '-'):>8} {r.get('process_s', '-'):>9} "
+                     f"{r.get('max_rss_mb', '-'):>7}  {r.get('error', '')[:60]}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline orchestration benchmark (mock LLM, DVWA stand-in, fake tools)")
+    # No `choices` here: Python 3.11 argparse checks the empty/default list itself against them.
+    parser.add_argument("phases", nargs="*", default=None, help="one or more of: " + ", ".join(PHASES))
+    parser.add_argument("--delay", type=float, default=TOOL_DELAY, help="seconds each fake tool sleeps")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.phases = args.phases or list(PHASES)
+    unknown = [p for p in args.phases if p not in PHASES]
+    if unknown:
+        parser.error(f"invalid phase(s): {', '.join(unknown)} (choose from {', '.join(PHASES)})")
+
+    if args.child:
+        # Leading newline: a human-input prompt left without a line break must not swallow the marker.
+        print("\nBENCH " + json.dumps(run_phase(args.child, args.delay)))
+        sys.exit(0)
+
+    results = run_benchmark(args.phases, args.delay)
+    print(format_results(results))
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    path = os.path.join(REPORT_DIR, f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"[+] Saved {path}")
@@ -0,0 +1,179 @@
+#browser_pool.py
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+POOL_SIZE = 4            # number of per-target contexts kept alive
+IDLE_TIMEOUT = 300       # seconds before an unused context (or the browser) is closed
+MAX_CONTEXT_USES = 50    # recycle a context after this many pages
+
+
+def origin_of(url: str) -> str:
+    parsed = urlparse(url if "://" in url else f"http://{url}")
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+class _PooledContext:
+    __slots__ = ("origin", "context", "uses", "last_used")
+
+    def __init__(self, origin, context):
+        self.origin = origin
+        self.context = context
+        self.uses = 0
+        self.last_used = time.monotonic()
+
+
+class BrowserPool:
+    """
+    Long-lived Chromium instance with one BrowserContext per target origin.
+    Contexts are reused across calls, recycled after `max_uses` pages and
+    evicted when idle or when the pool grows past `size`.
+    Playwright's sync API is bound to the thread that started it, so use
+    get_browser_pool() to obtain the pool for the current thread.
+    """
+
+    def __init__(self, size=POOL_SIZE, idle_timeout=IDLE_TIMEOUT, max_uses=MAX_CONTEXT_USES, headless=True):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.max_uses = max_uses
+        self.headless = headless
+        self._pw = None
+        self._browser = None
+        self._last_used = time.monotonic()
+        self._contexts = OrderedDict()
+
+    def _ensure_browser(self):
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+        self._close_browser()
+        # Imported here so that tools/teams which never open a page do not pay for Playwright.
+        from playwright.sync_api import sync_playwright
+
+        self._pw = sync_playwright().start()
+        self._browser = self._pw.chromium.launch(headless=self.headless)
+        return self._browser
+
+    def _close_context(self, entry):
+        try:
+            entry.context.close()
+        except Exception:
+            pass
+
+    def _close_browser(self):
+        for entry in self._contexts.values():
+            self._close_context(entry)
+        self._contexts.clear()
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception:
+                pass
+        if self._pw is not None:
+            try:
+                self._pw.stop()
+            except Exception:
+                pass
+        self._browser = None
+        self._pw = None
+
+    def evict_idle(self):
+        now = time.monotonic()
+        for origin, entry in list(self._contexts.items()):
+            if now - entry.last_used > self.idle_timeout:
+                self._close_context(self._contexts.pop(origin))
+        if not self._contexts and self._browser is not None and now - self._last_used > self.idle_timeout:
+            self._close_browser()
+
+    def acquire(self, url: str, setup=None, context_options=None) -> _PooledContext:
+        """
+        Return the context for url's origin. A new context is created with
+        `context_options` (e.g. storage_state) and passed to setup(context).
+        """
+        self.evict_idle()
+        origin = origin_of(url)
+        entry = self._contexts.get(origin)
+        if entry is not None and entry.uses >= self.max_uses:
+            self._close_context(self._contexts.pop(origin))
+            entry = None
+        if entry is None:
+            context = self._ensure_browser().new_context(**(context_options or {}))
+            if setup is not None:
+                setup(context)
+            entry = _PooledContext(origin, context)
+            self._contexts[origin] = entry
+            while len(self._contexts) > self.size:
+                _, oldest = self._contexts.popitem(last=False)
+                self._close_context(oldest)
+        self._contexts.move_to_end(origin)
+        entry.uses += 1
+        entry.last_used = self._last_used = time.monotonic()
+        return entry
+
+    def recycle(self, url: str):
+        entry = self._contexts.pop(origin_of(url), None)
+        if entry is not None:
+            self._close_context(entry)
+
+    @contextmanager
+    def page(self, url: str, setup=None, context_options=None):
+        entry = self.acquire(url, setup, context_options)
+        page = entry.context.new_page()
+        try:
+            yield page
+        except Exception:
+            # Drop the context so a broken session or crashed page isn't reused.
+            self.recycle(url)
+            raise
+        finally:
+            try:
+                page.close()
+            except Exception:
+                pass
+            entry.last_used = self._last_used = time.monotonic()
+
+    def close(self):
+        self._close_browser()
+
+
+_local = threading.local()
+_pools = []
+_pools_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    pool = getattr(_local, "pool", None)
+    if pool is None:
+        pool = _local.pool = BrowserPool(POOL_SIZE, IDLE_TIMEOUT, MAX_CONTEXT_USES)
+        with _pools_lock:
+            _pools.append(pool)
+    return pool
+
+
+def configure_browser_pool(size=None, idle_timeout=None, max_uses=None):
+    """Change the pool settings used by analyze_and_capture_url (current thread and future pools)."""
+    global POOL_SIZE, IDLE_TIMEOUT, MAX_CONTEXT_USES
+    if size is not None:
+        POOL_SIZE = size
+    if idle_timeout is not None:
+        IDLE_TIMEOUT = idle_timeout
+    if max_uses is not None:
+        MAX_CONTEXT_USES = max_uses
+    pool = getattr(_local, "pool", None)
+    if pool is not None:
+        pool.size, pool.idle_timeout, pool.max_uses = POOL_SIZE, IDLE_TIMEOUT, MAX_CONTEXT_USES
+        pool.evict_idle()
+
+
+@atexit.register
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools)
+        _pools.clear()
+    for pool in pools:
+        try:
+            pool.close()
+        except Exception:
+            pass
@@ -0,0 +1,134 @@
+#campaign.py
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from governor import TOOL_SLOTS, governor
+from resolver import resolver
+
+CAMPAIGN_DIR = "campaigns"
+MAX_PARALLEL_TARGETS = 4
+# Global caps across all targets: at most N processes of each tool at the same time.
+TOOL_CAPS = dict(TOOL_SLOTS)
+# Copied into every target workspace so the relative paths used by the agents keep working.
+SHARED_FILES = ("header.txt", "url_dvwa.txt")
+SEED_MESSAGE = ("Please start by reading header.txt using File-Reader to retrieve the cookie. "
+                "Do not ask for the target, it is given. The URL is : {target}")
+
+
+def target_slug(target):
+    """Directory name for a target: localhost:8085 -> localhost_8085."""
+    bare = target.split("://", 1)[-1].rstrip("/")
+    return re.sub(r"[^A-Za-z0-9.-]+", "_", bare).strip("_") or "target"
+
+
+def load_targets(items):
+    """Targets from the command line; an existing file is read as one target per line (# comments allowed)."""
+    targets = []
+    for item in items:
+        if os.path.isfile(item):
+            with open(item, "r", encoding="utf-8") as f:
+                targets += [line.split("#", 1)[0].strip() for line in f]
+        else:
+            targets.append(item.strip())
+    return list(dict.fromkeys(t for t in targets if t))
+
+
+def prepare_workspace(target, root=CAMPAIGN_DIR):
+    """campaigns/<slug>/ with its own pentest_results/ tree and a copy of the shared input files."""
+    workspace = os.path.abspath(os.path.join(root, target_slug(target)))
+    os.makedirs(workspace, exist_ok=True)
+    for name in SHARED_FILES:
+        if os.path.exists(name):
+            shutil.copy2(name, os.path.join(workspace, name))
+    return workspace
+
+
+def _init_worker(limits, caps):
+    governor.set_tool_limits(limits, caps)
+
+
+def run_target(target, workspace, executor_mode="blocking", result_cache_dir=None):
+    """Run the full pentest team for one target inside its workspace (called in a worker process)."""
+    start = time.time()
+    os.chdir(workspace)
+    try:
+        import main
+        from checkpoint import Checkpoint
+        from instrumentation import Instrumentation
+        from result_cache import ResultCache
+
+        main.ensure_directories()
+        checkpoint = Checkpoint("pentest").activate() if main.use_checkpoints else None
+        result_cache = ResultCache(root=result_cache_dir).activate() if main.use_result_cache and result_cache_dir else None
+        pentest = main.pentest_team(main.llm_config, interaction_mode="NEVER", executor_mode=executor_mode,
+                                    checkpoint=checkpoint, result_cache=result_cache)
+        instrumentation = Instrumentation(main.config_list).attach(pentest["team"].agents) if main.use_instrumentation else None
+        pentest["user_proxy"].initiate_chat(pentest["manager"], message=SEED_MESSAGE.format(target=target))
+        if checkpoint:
+            checkpoint.save()
+        if instrumentation:
+            instrumentation.write_summary()
+        status, error = "done", ""
+    except Exception:
+        status, error = "failed", traceback.format_exc(limit=5)
+    return {
+        "target": target,
+        "workspace": workspace,
+        "status": status,
+        "seconds": round(time.time() - start, 1),
+        "error": error,
+    }
+
+
+def run_campaign(targets, max_parallel=MAX_PARALLEL_TARGETS, tool_caps=None, executor_mode="blocking", root=CAMPAIGN_DIR):
+    """One team per target on a process pool; tool caps are shared semaphores across all workers."""
+    ctx = multiprocessing.get_context("spawn")
+    caps = TOOL_CAPS if tool_caps is None else tool_caps
+    limits = {tool: ctx.BoundedSemaphore(n) for tool, n in caps.items() if n > 0}
+    result_cache_dir = os.path.abspath(os.path.join(".cache", "results"))
+    results = []
+    # One parallel DNS batch up front; names that do not resolve never take a worker slot.
+    resolved = resolver.resolve_many(targets)
+    for target in [t for t in targets if isinstance(resolved[t], str)]:
+        print(f"[unresolved] {target}: {resolved[target]}")
+        results.append({"target": target, "workspace": "", "status": "unresolved", "seconds": 0.0, "error": resolved[target]})
+    targets = [t for t in targets if not isinstance(resolved[t], str)]
+    with ProcessPoolExecutor(max_workers=max(1, min(max_parallel, len(targets))), mp_context=ctx,
+                             initializer=_init_worker, initargs=(limits, caps)) as pool:
+        futures = {
+            pool.submit(run_target, target, prepare_workspace(target, root), executor_mode, result_cache_dir): target
+            for target in targets
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            print(f"[{result['status']}] {result['target']} in {result['seconds']}s -> {result['workspace']}")
+            results.append(result)
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, "campaign_summary.json"), "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the pentest team against many targets in parallel")
+    parser.add_argument("targets", nargs="+", help="targets (host:port or URL) or files with one target per line")
+    parser.add_argument("--parallel", type=int, default=MAX_PARALLEL_TARGETS, help="targets processed at the same time")
+    parser.add_argument("--cap", action="append", default=[], metavar="TOOL=N",
+                        help="override a per-tool concurrency cap, e.g. --cap nuclei=2")
+    parser.add_argument("--executor-mode", default="blocking", choices=["blocking", "background"])
+    args = parser.parse_args()
+
+    caps = dict(TOOL_CAPS)
+    for item in args.cap:
+        tool, _, n = item.partition("=")
+        caps[tool] = int(n)
+    targets = load_targets(args.targets)
+    print(f"=== CAMPAIGN: {len(targets)} target(s), {args.parallel} in parallel ===")
+    run_campaign(targets, max_parallel=args.parallel, tool_caps=caps, executor_mode=args.executor_mode)
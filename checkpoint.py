@@ -0,0 +1,151 @@
+#checkpoint.py
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, List
+
+from command_validator import extract_commands, validate_command
+
+if TYPE_CHECKING:
+    from autogen.coding.base import CodeBlock, CommandLineCodeResult
+
+CHECKPOINT_DIR = "pentest_results/checkpoints"
+
+_current = None
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                h.update(block)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+
+def normalize_command(command):
+    return re.sub(r"\s+", " ", command.strip())
+
+
+def command_outputs(code):
+    """Output files written by the commands of a shell block (-oN/-o/--output/> file)."""
+    outputs = []
+    for command in extract_commands(f"```bash\n{code}\n```"):
+        outputs += validate_command(command).outputs
+    return list(dict.fromkeys(outputs))
+
+
+class Checkpoint:
+    """
+    Per-team run state saved under pentest_results/checkpoints/<team>.json after every
+    executed step: the group chat messages and each executed command with its exit code
+    and the sha256 of the files it wrote.
+    """
+
+    def __init__(self, team, directory=CHECKPOINT_DIR, resume=False):
+        self.team = team
+        self.path = os.path.join(directory, f"{team}.json")
+        self.messages = []
+        self.commands = {}
+        self.groupchat = None
+        self._lock = threading.Lock()
+        if resume and os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.messages = state.get("messages", [])
+            self.commands = state.get("commands", {})
+
+    def track(self, groupchat):
+        self.groupchat = groupchat
+        return self
+
+    def activate(self):
+        """Make this the checkpoint consulted by run_scan_batch."""
+        global _current
+        _current = self
+        return self
+
+    def is_done(self, code):
+        """True if the block finished with exit code 0 earlier and its output files are unchanged."""
+        entry = self.commands.get(normalize_command(code))
+        if not entry or entry["exit_code"] != 0 or not entry["outputs"]:
+            return False
+        return all(file_hash(path) == digest for path, digest in entry["outputs"].items())
+
+    def record(self, code, exit_code):
+        outputs = {path: file_hash(path) for path in command_outputs(code)}
+        with self._lock:
+            self.commands[normalize_command(code)] = {
+                "exit_code": exit_code,
+                "outputs": {path: digest for path, digest in outputs.items() if digest},
+                "ts": time.time(),
+            }
+        self.save()
+
+    def save(self):
+        with self._lock:
+            if self.groupchat is not None:
+                self.messages = list(self.groupchat.messages)
+            state = {"team": self.team, "updated": time.time(), "messages": self.messages, "commands": self.commands}
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state, f, indent=2, default=str)
+            os.replace(tmp, self.path)
+
+
+def current_checkpoint():
+    return _current
+
+
+class CheckpointedCodeExecutor:
+    """Wraps a code executor: skips shell blocks already finished with unchanged outputs and checkpoints after each block."""
+
+    def __init__(self, executor, checkpoint):
+        self.executor = executor
+        self.checkpoint = checkpoint
+        # A background executor returns exit code 0 as soon as a job starts; record its blocks when the job ends.
+        self.deferred_record = False
+        inner = executor
+        while inner is not None:
+            if hasattr(inner, "finish_hooks"):
+                inner.finish_hooks.append(checkpoint.record)
+                self.deferred_record = True
+                break
+            inner = getattr(inner, "executor", None)
+
+    @property
+    def code_extractor(self):
+        return self.executor.code_extractor
+
+    def execute_code_blocks(self, code_blocks: List["CodeBlock"]) -> "CommandLineCodeResult":
+        # autogen is only needed once a team runs code; recon_scheduler/fast_path import this module without it.
+        from autogen.coding.base import CommandLineCodeResult
+        from code_executors import SHELL_LANGS
+
+        outputs, exit_code, code_file = [], 0, None
+        for block in code_blocks:
+            shell = block.language.lower() in SHELL_LANGS
+            if shell and self.checkpoint.is_done(block.code):
+                outputs.append(f"[resume] skipped, already finished with unchanged outputs: {block.code.strip()}")
+                continue
+            result = self.executor.execute_code_blocks([block])
+            if not (shell and self.deferred_record):
+                self.checkpoint.record(block.code, result.exit_code)
+            outputs.append(result.output)
+            exit_code, code_file = result.exit_code, result.code_file
+            if exit_code != 0:
+                break
+        return CommandLineCodeResult(exit_code=exit_code, output="\n".join(outputs), code_file=code_file)
+
+    def restart(self):
+        self.executor.restart()
+
+
+def with_checkpoint(executor, checkpoint):
+    return CheckpointedCodeExecutor(executor, checkpoint) if checkpoint is not None else executor
@@ -0,0 +1,276 @@
+#code_executors.py
+import os
+import re
+import shlex
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from typing import List
+
+from autogen.coding.base import CodeBlock, CommandLineCodeResult
+from autogen.coding.local_commandline_code_executor import LocalCommandLineCodeExecutor
+
+from governor import governor
+from lazy_agents import register_llm_tool
+
+EXECUTOR_TIMEOUT = 3600
+JOB_DIR = "pentest_results/jobs"
+RING_BUFFER_LINES = 2000
+SHELL_LANGS = ("bash", "sh", "shell")
+
+# `cmd > file` / `cmd >> file` / `cmd 1> file` at the very end of a command (optionally with 2>&1).
+# The operator must follow whitespace: `2>/dev/null`, `&>f` and `>&2` are left to the shell.
+_REDIRECT_RE = re.compile(r"\s(?:2>&1\s+)?(1?>>?)\s*([^\s'\"|&;<>]+)(?:\s+2>&1)?\s*$")
+
+JOB_TOOLS_HINT = """
+Long commands run in the background and return a job id.
+Use job_status / tail_job to read partial output while they run, cancel_job to stop one, list_jobs to see all jobs.
+"""
+
+
+def split_output_redirect(command):
+    """
+    (command, file, append) when the command ends with a plain stdout redirect
+    (`> f`, `>> f`, `1> f`, optionally with 2>&1), else None.
+    """
+    match = _REDIRECT_RE.search(command)
+    if not match:
+        return None
+    head = command[:match.start()]
+    try:
+        # Unbalanced quotes mean the `>` sits inside a quoted argument.
+        if not shlex.split(head):
+            return None
+    except ValueError:
+        return None
+    return head, match.group(2), match.group(1).endswith(">>")
+
+
+class BackgroundJob:
+    def __init__(self, command, output_file, append, work_dir):
+        self.id = uuid.uuid4().hex[:8]
+        self.command = command
+        self.output_file = output_file
+        self.append = append
+        self.work_dir = work_dir
+        self.buffer = deque(maxlen=RING_BUFFER_LINES)
+        self.lines_seen = 0
+        self.started = time.time()
+        self.finished = None
+        self.exit_code = None
+        self.cancelled = False
+        self.process = None
+        self.ticket = None
+        self._reader = None
+
+    @property
+    def status(self):
+        if self.finished is None:
+            return "running"
+        if self.cancelled:
+            return "cancelled"
+        return "done" if self.exit_code == 0 else "failed"
+
+    def summary(self):
+        end = self.finished or time.time()
+        return (f"job {self.id} [{self.status}] exit_code={self.exit_code} "
+                f"elapsed={end - self.started:.1f}s lines={self.lines_seen} output={self.output_file}")
+
+
+class JobManager:
+    """Starts shell commands in the background and keeps a tail of their output."""
+
+    def __init__(self, job_dir=JOB_DIR):
+        self.job_dir = job_dir
+        self.jobs = {}
+        self._lock = threading.Lock()
+
+    def start(self, command: str, work_dir: str = ".", timeout: int = EXECUTOR_TIMEOUT, on_finish=None) -> BackgroundJob:
+        """on_finish(job) is called from the reader thread once the process has exited."""
+        ticket = governor.acquire(command)
+        command = ticket.command
+        output_file, append = None, False
+        redirect = split_output_redirect(command)
+        if redirect:
+            # Stream the output ourselves so it can be tailed while the command runs.
+            command, output_file, append = redirect
+        job = BackgroundJob(command, output_file, append, work_dir)
+        job.ticket = ticket
+        if job.output_file is None:
+            job.output_file = os.path.join(self.job_dir, f"{job.id}.log")
+        path = os.path.join(work_dir, job.output_file)
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            job.process = subprocess.Popen(
+                ["bash", "-c", command], cwd=work_dir,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                text=True, errors="replace", bufsize=1, start_new_session=True,
+            )
+        except OSError:
+            ticket.release()
+            raise
+        job._reader = threading.Thread(target=self._pump, args=(job, path, timeout, on_finish), daemon=True)
+        job._reader.start()
+        with self._lock:
+            self.jobs[job.id] = job
+        return job
+
+    def _pump(self, job, path, timeout, on_finish=None):
+        timer = threading.Timer(timeout, self._kill, args=(job,))
+        timer.daemon = True
+        timer.start()
+        try:
+            with open(path, "a" if job.append else "w", encoding="utf-8") as out:
+                for line in job.process.stdout:
+                    out.write(line)
+                    out.flush()
+                    job.buffer.append(line.rstrip("\n"))
+                    job.lines_seen += 1
+            job.exit_code = job.process.wait()
+        finally:
+            timer.cancel()
+            job.finished = time.time()
+            job.ticket.release()
+            if on_finish is not None:
+                try:
+                    on_finish(job)
+                except Exception as e:
+                    print(f"[!] job {job.id} completion hook failed: {e}")
+
+    def _kill(self, job):
+        try:
+            os.killpg(job.process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None or job.finished is not None:
+            return job
+        job.cancelled = True
+        self._kill(job)
+        return job
+
+    def wait(self, job_id, timeout=None):
+        job = self.get(job_id)
+        if job is not None and job._reader is not None:
+            job._reader.join(timeout)
+        return job
+
+
+job_manager = JobManager()
+
+
+class BackgroundCommandLineCodeExecutor:
+    """
+    Code executor that starts shell blocks as background jobs and returns a
+    job handle immediately instead of blocking the chat until the process
+    exits. Other languages fall back to the blocking local executor.
+    """
+
+    def __init__(self, timeout=EXECUTOR_TIMEOUT, work_dir=".", jobs=None):
+        self.timeout = timeout
+        self.work_dir = work_dir
+        self.jobs = jobs or job_manager
+        self._blocking = LocalCommandLineCodeExecutor(timeout=timeout, work_dir=work_dir)
+        # hook(code, exit_code) for every shell block, called when its job has finished.
+        self.finish_hooks = []
+
+    @property
+    def code_extractor(self):
+        return self._blocking.code_extractor
+
+    def execute_code_blocks(self, code_blocks: List[CodeBlock]) -> CommandLineCodeResult:
+        lines = []
+        for block in code_blocks:
+            if block.language.lower() not in SHELL_LANGS:
+                result = self._blocking.execute_code_blocks([block])
+                lines.append(result.output)
+                if result.exit_code != 0:
+                    return CommandLineCodeResult(exit_code=result.exit_code, output="\n".join(lines))
+                continue
+            LocalCommandLineCodeExecutor.sanitize_command(block.language.lower(), block.code)
+            job = self.jobs.start(block.code.strip(), work_dir=self.work_dir, timeout=self.timeout,
+                                  on_finish=lambda job, code=block.code: self._finished(code, job))
+            lines.append(f"Started {job.summary()}")
+        return CommandLineCodeResult(exit_code=0, output="\n".join(lines))
+
+    def _finished(self, code, job):
+        for hook in self.finish_hooks:
+            hook(code, job.exit_code)
+
+    def restart(self):
+        pass
+
+
+class GovernedCommandLineCodeExecutor(LocalCommandLineCodeExecutor):
+    """Blocking local executor that admits each shell block through the governor (slots, rate flags, load)."""
+
+    def execute_code_blocks(self, code_blocks: List[CodeBlock]) -> CommandLineCodeResult:
+        outputs, result = [], None
+        for block in code_blocks:
+            if block.language.lower() not in SHELL_LANGS:
+                result = super().execute_code_blocks([block])
+            else:
+                with governor.admit(block.code) as command:
+                    result = super().execute_code_blocks([CodeBlock(code=command, language=block.language)])
+            outputs.append(result.output)
+            if result.exit_code != 0:
+                break
+        if result is None:
+            return super().execute_code_blocks(code_blocks)
+        return CommandLineCodeResult(exit_code=result.exit_code, output="".join(outputs), code_file=result.code_file)
+
+
+def create_code_executor(mode: str = "blocking", timeout: int = EXECUTOR_TIMEOUT, work_dir: str = "."):
+    """Executor used by the Code-Executor agents: "blocking" (default) or "background"."""
+    if mode == "background":
+        return BackgroundCommandLineCodeExecutor(timeout=timeout, work_dir=work_dir)
+    return GovernedCommandLineCodeExecutor(timeout=timeout, work_dir=work_dir)
+
+
+def job_status(job_id: str) -> str:
+    job = job_manager.get(job_id)
+    return job.summary() if job else f"Unknown job: {job_id}"
+
+
+def tail_job(job_id: str, lines: int = 50) -> str:
+    job = job_manager.get(job_id)
+    if job is None:
+        return f"Unknown job: {job_id}"
+    tail = list(job.buffer)[-max(1, lines):]
+    return job.summary() + "\n" + "\n".join(tail)
+
+
+def cancel_job(job_id: str) -> str:
+    job = job_manager.cancel(job_id)
+    return f"Cancel requested: {job.summary()}" if job else f"Unknown job: {job_id}"
+
+
+def list_jobs() -> str:
+    with job_manager._lock:
+        jobs = list(job_manager.jobs.values())
+    if not jobs:
+        return "No background jobs."
+    return "\n".join(f"{job.summary()} :: {job.command}" for job in jobs)
+
+
+def register_job_tools(caller, executor):
+    """Let `caller` poll/tail/cancel background jobs; `executor` runs the tool calls."""
+    tools = [
+        ("job_status", "Show status of a background command job", job_status),
+        ("tail_job", "Show the last lines of a background command job's output", tail_job),
+        ("cancel_job", "Cancel a running background command job", cancel_job),
+        ("list_jobs", "List background command jobs", list_jobs),
+    ]
+    for name, description, func in tools:
+        register_llm_tool(caller, name=name, description=description)(func)
+        executor.register_for_execution(name=name)(func)
+    caller.update_system_message(caller.system_message + JOB_TOOLS_HINT)
@@ -0,0 +1,329 @@
+#command_validator.py
+import os
+import re
+import shlex
+
+RESULTS_DIR = "pentest_results"
+OK, REJECT, UNKNOWN = "ok", "reject", "unknown"
+
+# Commands that may feed a scanner through a pipe (`cat urls.txt | nuclei ...`).
+FEEDERS = {"cat", "echo", "printf"}
+
+_CODE_BLOCK_RE = re.compile(r"```(?:bash|sh|shell)?[ \t]*\n(.*?)```", re.DOTALL)
+
+
+class ToolSpec:
+    """
+    Argument grammar of one scanner.
+    value_flags take an argument (next token, `--flag=value`, or attached for `attached` prefixes),
+    output_flags are the subset whose argument is an output path,
+    required lists groups of flags of which at least one must be present
+    ("@target" = a positional argument, "@stdin" = input piped from a feeder).
+    """
+
+    def __init__(self, subdir, bool_flags=(), value_flags=(), output_flags=(), attached=(),
+                 required=(), go_flags=False, subcommands=None, wordlist_flags=()):
+        self.subdir = subdir
+        self.bool_flags = set(bool_flags)
+        self.value_flags = set(value_flags) | set(output_flags) | set(wordlist_flags)
+        self.output_flags = set(output_flags)
+        self.attached = tuple(attached)
+        self.required = [tuple(group) for group in required]
+        self.go_flags = go_flags
+        self.subcommands = subcommands
+        self.wordlist_flags = set(wordlist_flags)
+
+
+TOOLS = {
+    "nmap": ToolSpec(
+        "recon",
+        bool_flags=["-sS", "-sT", "-sU", "-sV", "-sC", "-sN", "-sF", "-sX", "-sA", "-sW", "-sM", "-sn", "-sL",
+                    "-Pn", "-O", "-A", "-v", "-vv", "-d", "-n", "-R", "-F", "-r", "-6", "--open", "--reason",
+                    "--traceroute", "--version-all", "--version-light", "--privileged", "--unprivileged",
+                    "--osscan-guess", "--system-dns", "--packet-trace", "--badsum", "--defeat-rst-ratelimit"],
+        value_flags=["-p", "-iL", "-e", "-D", "-S", "-g", "--top-ports", "--script", "--script-args",
+                     "--max-rate", "--min-rate", "--max-retries", "--host-timeout", "--exclude", "--source-port",
+                     "--data-length", "--version-intensity", "--stats-every", "--max-parallelism",
+                     "--min-parallelism", "--scan-delay", "--max-scan-delay", "--ttl", "--dns-servers",
+                     "--min-hostgroup", "--max-hostgroup", "--port-ratio", "--exclude-ports"],
+        output_flags=["-oN", "-oX", "-oG", "-oA", "-oS"],
+        attached=["-p", "-T", "-PS", "-PA", "-PU", "-PY", "-PE", "-PP", "-PM", "-PR", "-v", "-d"],
+        required=[("@target", "-iL")],
+    ),
+    "whatweb": ToolSpec(
+        "recon",
+        bool_flags=["-v", "--verbose", "-q", "--quiet", "--no-errors", "--color=never", "--colour=never",
+                    "-l", "--list-plugins", "--follow-redirect=never", "--follow-redirect=always"],
+        value_flags=["-a", "--aggression", "-i", "--input-file", "-U", "--user-agent", "-H", "--header",
+                     "-c", "--cookie", "--follow-redirect", "--max-redirects", "-t", "--max-threads",
+                     "-p", "--plugins", "--open-timeout", "--read-timeout", "--wait", "--proxy", "--color",
+                     "--colour", "--url-prefix", "--url-suffix"],
+        output_flags=["--log-brief", "--log-verbose", "--log-json", "--log-json-verbose", "--log-xml",
+                      "--log-object", "--log-magic", "--log-errors"],
+        required=[("@target", "-i", "--input-file")],
+    ),
+    "gobuster": ToolSpec(
+        "recon",
+        bool_flags=["-k", "--no-tls-validation", "-q", "--quiet", "-r", "--follow-redirect", "-e", "--expanded",
+                    "-n", "--no-status", "-z", "--no-progress", "-l", "--include-length", "-d",
+                    "--discover-backup", "--wildcard", "--random-agent", "--no-error", "-f", "--add-slash",
+                    "--retry", "--hide-length", "--no-color", "--debug", "-v", "--verbose"],
+        value_flags=["-u", "--url", "-t", "--threads", "-x", "--extensions", "-s", "--status-codes",
+                     "-b", "--status-codes-blacklist", "-c", "--cookies", "-H", "--headers", "-a",
+                     "--useragent", "--timeout", "--delay", "-U", "--username", "-P", "--password",
+                     "-p", "--proxy", "-m", "--method", "--exclude-length", "--retry-attempts",
+                     "--pattern", "--domain", "--append-domain"],
+        output_flags=["-o", "--output"],
+        wordlist_flags=["-w", "--wordlist"],
+        required=[("-u", "--url"), ("-w", "--wordlist")],
+        subcommands={"dir", "dns", "vhost", "fuzz", "s3", "gcs", "tftp"},
+    ),
+    "hakrawler": ToolSpec(
+        "recon",
+        bool_flags=["-insecure", "-json", "-s", "-subs", "-u", "-dr", "-i"],
+        value_flags=["-d", "-h", "-size", "-t", "-timeout", "-proxy"],
+        go_flags=True,
+        required=[("@stdin",)],
+    ),
+    "nuclei": ToolSpec(
+        "vulnscan",
+        bool_flags=["-silent", "-nc", "-no-color", "-v", "-verbose", "-debug", "-as", "-automatic-scan",
+                    "-stats", "-irr", "-fr", "-follow-redirects", "-nmhe", "-duc", "-up", "-ut", "-jsonl",
+                    "-j", "-json", "-ni", "-no-interactsh", "-sresp", "-omit-raw", "-or", "-nh",
+                    "-no-httpx", "-headless", "-dast", "-fuzz", "-sb", "-sa", "-scan-all-ips"],
+        value_flags=["-u", "-target", "-l", "-list", "-t", "-templates", "-tags", "-etags", "-exclude-tags",
+                     "-severity", "-s", "-es", "-exclude-severity", "-H", "-header", "-rl", "-rate-limit",
+                     "-rlm", "-c", "-concurrency", "-bs", "-bulk-size", "-timeout", "-retries", "-id",
+                     "-template-id", "-eid", "-exclude-id", "-var", "-V", "-itags", "-include-tags",
+                     "-w", "-workflows", "-pt", "-type", "-proxy", "-p", "-mhe", "-max-host-error"],
+        output_flags=["-o", "-output", "-je", "-json-export", "-jle", "-jsonl-export", "-me",
+                      "-markdown-export", "-se", "-sarif-export"],
+        go_flags=True,
+        required=[("-u", "-target", "-l", "-list", "@stdin")],
+    ),
+    "sqlmap": ToolSpec(
+        "exploit",
+        bool_flags=["--batch", "--dump", "--dbs", "--tables", "--columns", "--current-user", "--current-db",
+                    "--banner", "--random-agent", "--flush-session", "--forms", "--is-dba", "--users",
+                    "--passwords", "--fresh-queries", "--eta", "--disable-coloring", "--smart", "--hostname",
+                    "--schema", "--count", "--privileges", "--roles", "--no-cast", "--hex", "--keep-alive",
+                    "--null-connection", "--text-only", "--titles", "-a", "--all", "-b", "-f", "--fingerprint",
+                    "--parse-errors", "--skip-waf", "--offline"],
+        value_flags=["-u", "--url", "-r", "-m", "--data", "--cookie", "--level", "--risk", "-p", "--dbms",
+                     "--technique", "-D", "-T", "-C", "--sql-query", "--threads", "--crawl", "--answers",
+                     "--delay", "--timeout", "--retries", "--tamper", "-v", "--string", "--not-string",
+                     "--method", "--headers", "-H", "--header", "--proxy", "--time-sec", "--union-cols",
+                     "--prefix", "--suffix", "--skip", "--ignore-code", "--param-del", "--cookie-del",
+                     "--user-agent", "-A", "--referer", "--where", "--start", "--stop", "--first", "--last",
+                     "--os", "--code", "--regexp", "--second-url", "--csrf-token", "--csrf-url"],
+        output_flags=["--output-dir", "-t", "--traffic-file"],
+        required=[("-u", "--url", "-r", "-m")],
+    ),
+    "curl": ToolSpec(
+        "exploit",
+        bool_flags=["-s", "--silent", "-S", "--show-error", "-k", "--insecure", "-L", "--location", "-i",
+                    "--include", "-I", "--head", "-v", "--verbose", "-G", "--get", "--compressed", "-f",
+                    "--fail", "--path-as-is", "-g", "--globoff", "-O", "--remote-name", "-sS", "-sk", "-sL",
+                    "-skL", "-sSL", "-kL", "-ks", "-Ls", "-sI"],
+        value_flags=["-b", "--cookie", "-c", "--cookie-jar", "-H", "--header", "-d", "--data",
+                     "--data-urlencode", "--data-raw", "--data-binary", "-X", "--request", "-A", "--user-agent",
+                     "-e", "--referer", "-u", "--user", "-x", "--proxy", "--max-time", "-m",
+                     "--connect-timeout", "-w", "--write-out", "--retry", "--url", "-F", "--form"],
+        output_flags=["-o", "--output"],
+        required=[("@target", "--url")],
+    ),
+}
+
+
+class Verdict:
+    __slots__ = ("status", "command", "errors", "outputs")
+
+    def __init__(self, status, command, errors=(), outputs=()):
+        self.status = status
+        self.command = command
+        self.errors = list(errors)
+        self.outputs = list(outputs)
+
+    def __repr__(self):
+        return f"Verdict({self.status!r}, errors={self.errors!r}, outputs={self.outputs!r})"
+
+
+_STDERR_RE = re.compile(r"(?<=\s)2>>?(?:&1|\s*[^\s|&;<>]+)")
+
+
+def _split_segments(command):
+    # Drop stderr redirects first: once lexed, `2>&1` is indistinguishable from `-d 2 > file`.
+    command = _STDERR_RE.sub(" ", command)
+    lexer = shlex.shlex(command, posix=True, punctuation_chars="|&;<>")
+    lexer.whitespace_split = True
+    tokens = list(lexer)
+    segments, current, redirects = [], [], []
+    i = 0
+    while i < len(tokens):
+        tok = tokens[i]
+        if tok == "|":
+            segments.append(current)
+            current = []
+        elif tok in (">", ">>", "&>", "&>>"):
+            target = tokens[i + 1] if i + 1 < len(tokens) else ""
+            i += 1
+            if target and target != "/dev/null":
+                redirects.append(target)
+        elif tok in ("&&", ";", "||", "&", "<", ">&"):
+            raise ValueError(f"unsupported shell operator '{tok}'")
+        else:
+            current.append(tok)
+        i += 1
+    segments.append(current)
+    return segments, redirects
+
+
+def in_results_dir(path, subdir):
+    norm = os.path.normpath(path).replace("\\", "/")
+    prefix = f"{RESULTS_DIR}/{subdir}/"
+    return norm.startswith(prefix) or f"/{prefix}" in norm
+
+
+def _check_tool(name, args, spec, piped_input):
+    errors, outputs, unknown = [], [], []
+    present, positionals = set(), []
+    i = 0
+    if spec.subcommands is not None:
+        if not args or args[0] not in spec.subcommands:
+            return [f"{name}: missing or unknown mode (expected one of {', '.join(sorted(spec.subcommands))})"], [], []
+        i = 1
+    while i < len(args):
+        tok = args[i]
+        if not tok.startswith("-") or tok == "-":
+            positionals.append(tok)
+            i += 1
+            continue
+        flag, value = tok, None
+        if spec.go_flags and flag.startswith("--"):
+            flag = flag[1:]
+        if "=" in flag and flag.split("=", 1)[0] in spec.value_flags:
+            flag, value = flag.split("=", 1)
+        elif flag in spec.bool_flags:
+            pass
+        elif flag in spec.value_flags:
+            if i + 1 >= len(args):
+                errors.append(f"{name}: flag {flag} needs a value")
+                break
+            value = args[i + 1]
+            i += 1
+        elif any(flag.startswith(p) and len(flag) > len(p) for p in spec.attached):
+            flag = next(p for p in spec.attached if tok.startswith(p))
+        else:
+            unknown.append(tok)
+        present.add(flag)
+        if value is not None:
+            if flag in spec.output_flags:
+                outputs.append(value)
+            if flag in spec.wordlist_flags and not os.path.exists(value):
+                errors.append(f"{name}: wordlist not found: {value}")
+        i += 1
+    for group in spec.required:
+        ok = any(
+            (g == "@target" and positionals) or (g == "@stdin" and piped_input) or g in present
+            for g in group
+        )
+        if not ok:
+            wanted = " / ".join(g.replace("@target", "a target").replace("@stdin", "piped input") for g in group)
+            errors.append(f"{name}: missing {wanted}")
+    return errors, outputs, unknown
+
+
+def validate_command(command: str) -> Verdict:
+    """
+    Check one scanner command line against TOOLS.
+    ok      - flags known, required arguments present, output written under pentest_results/<subdir>/
+    reject  - a definite mistake (missing output/target/wordlist, wrong output directory, dangling flag)
+    unknown - not a known tool or an unrecognised flag: let the LLM checker decide
+    """
+    command = command.strip()
+    try:
+        segments, redirects = _split_segments(command)
+    except ValueError as e:
+        return Verdict(UNKNOWN, command, [str(e)])
+    if not segments or not segments[0]:
+        return Verdict(UNKNOWN, command, ["empty command"])
+
+    tool, errors, outputs, unknown, piped = None, [], list(redirects), [], False
+    for index, segment in enumerate(segments):
+        if not segment:
+            return Verdict(REJECT, command, ["empty pipeline segment"])
+        prog = os.path.basename(segment[0])
+        if prog == "sudo" and len(segment) > 1:
+            segment = segment[1:]
+            prog = os.path.basename(segment[0])
+        if prog in TOOLS and tool is None:
+            tool = prog
+            e, o, u = _check_tool(prog, segment[1:], TOOLS[prog], piped)
+            errors += e
+            outputs += o
+            unknown += u
+        elif prog == "tee":
+            outputs += [a for a in segment[1:] if not a.startswith("-")]
+        elif prog in FEEDERS and tool is None:
+            piped = True
+        else:
+            return Verdict(UNKNOWN, command, [f"unrecognised command '{prog}'"])
+
+    if tool is None:
+        return Verdict(UNKNOWN, command, ["no known scanner in command"])
+    subdir = TOOLS[tool].subdir
+    if not outputs:
+        errors.append(f"{tool}: output is not saved; use the tool's output flag, `> file` or `| tee file` "
+                      f"under {RESULTS_DIR}/{subdir}/")
+    for path in outputs:
+        if not in_results_dir(path, subdir):
+            errors.append(f"{tool}: output {path} must be inside {RESULTS_DIR}/{subdir}/")
+    if errors:
+        return Verdict(REJECT, command, errors, outputs)
+    if unknown:
+        return Verdict(UNKNOWN, command, [f"{tool}: unrecognised flag(s) {' '.join(unknown)}"], outputs)
+    return Verdict(OK, command, [], outputs)
+
+
+def extract_commands(text):
+    """Shell command lines inside ```bash blocks (backslash continuations joined, comments dropped)."""
+    commands = []
+    for block in _CODE_BLOCK_RE.findall(text or ""):
+        joined = re.sub(r"\\\n\s*", " ", block)
+        commands += [line.strip() for line in joined.splitlines() if line.strip() and not line.strip().startswith("#")]
+    return commands
+
+
+def attach_local_validator(checker):
+    """
+    Put the deterministic check in front of an LLM checker agent.
+    All commands valid   -> reply with them in a bash block (no completion).
+    Any definite mistake -> reply with the errors so the author rewrites it (no completion).
+    Otherwise (no command, unknown tool/flag, or commands it already approved) -> fall through to the LLM.
+    """
+    from autogen.agentchat import Agent
+
+    approved = set()
+
+    def local_check_reply(recipient, messages=None, sender=None, config=None):
+        if not messages:
+            return False, None
+        content = messages[-1].get("content")
+        commands = extract_commands(content if isinstance(content, str) else "")
+        if not commands or all(cmd in approved for cmd in commands):
+            return False, None
+        verdicts = [validate_command(cmd) for cmd in commands]
+        if any(v.status == UNKNOWN for v in verdicts):
+            return False, None
+        rejected = [v for v in verdicts if v.status == REJECT]
+        if rejected:
+            lines = ["Local command check failed, please rewrite:"]
+            for v in rejected:
+                lines.append(f"`{v.command}`")
+                lines.extend(f"- {e}" for e in v.errors)
+            return True, "\n".join(lines)
+        approved.update(commands)
+        return True, "```bash\n" + "\n".join(commands) + "\n```"
+
+    checker.register_reply([Agent, None], local_check_reply, position=0)
+    return checker
@@ -0,0 +1,206 @@
+#dir_prober.py
+import asyncio
+import os
+import ssl
+import time
+from urllib.parse import urlparse
+
+from governor import RATE_LIMITS, governor
+from response_clusters import collapse, fetch_baselines
+from session_cache import HEADER_FILE, header_cookie_pairs
+
+PROBE_CONCURRENCY = 10        # keep-alive connections to the target
+PROBE_TIMEOUT = 5.0           # seconds per request
+PROBE_RATE = RATE_LIMITS.get("gobuster", 0)   # requests/s when the governor assigns no share (0 = unlimited)
+HIDE_STATUS = "404"
+DEFAULT_OUTPUT = "pentest_results/recon/gobuster_scan.txt"
+MAX_RETURN_LINES = 200
+USER_AGENT = "Mozilla/5.0 (dir_prober)"
+
+
+def load_words(wordlist):
+    with open(wordlist, "r", encoding="utf-8", errors="replace") as f:
+        words = [line.split()[0] for line in f if line.strip() and not line.startswith("#")]
+    return list(dict.fromkeys(words))
+
+
+def gobuster_line(record):
+    """Same layout as `gobuster dir` output, so findings.parse_gobuster reads both."""
+    line = f"{record['path']:<21} (Status: {record['status']}) [Size: {record['size']}]"
+    return line + (f" [--> {record['redirect']}]" if record["redirect"] else "")
+
+
+class _Connection:
+    """One keep-alive HTTP/1.1 connection; reopened when the server closes it."""
+
+    def __init__(self, host, port, tls):
+        self.host, self.port, self.tls = host, port, tls
+        self.reader = self.writer = None
+
+    async def _open(self):
+        ctx = None
+        if self.tls:
+            ctx = ssl.create_default_context()
+            ctx.check_hostname = False
+            ctx.verify_mode = ssl.CERT_NONE
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=ctx)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def _read_body(self, headers):
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = b""
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return body, True
+                body += await self.reader.readexactly(size)
+                await self.reader.readline()
+        if "content-length" in headers:
+            return await self.reader.readexactly(int(headers["content-length"])), True
+        return await self.reader.read(), False
+
+    async def _request_once(self, request):
+        if self.writer is None:
+            await self._open()
+        self.writer.write(request)
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by server")
+        version, status = status_line.split()[0], int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body, reusable = (b"", True) if status in (204, 304) or 100 <= status < 200 else await self._read_body(headers)
+        keep_alive = headers.get("connection", "").lower() == "keep-alive" or (
+            version != b"HTTP/1.0" and headers.get("connection", "").lower() != "close")
+        if not reusable or not keep_alive:
+            self.close()
+        return status, headers, body
+
+    async def request(self, request):
+        try:
+            return await self._request_once(request)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # Stale keep-alive socket: retry once on a fresh connection.
+            self.close()
+            return await self._request_once(request)
+
+
+class _Pacer:
+    """Spreads request starts evenly so the whole probe stays under `rate` requests/s."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self.next_slot = 0.0
+
+    async def wait(self):
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def probe_paths_async(base_url, words, concurrency=PROBE_CONCURRENCY, timeout=PROBE_TIMEOUT,
+                            rate=PROBE_RATE, cookie=""):
+    """GET base_url/<word> for every word over a pool of keep-alive connections; one record per word."""
+    parsed = urlparse(base_url if "://" in base_url else f"http://{base_url}")
+    tls = parsed.scheme == "https"
+    port = parsed.port or (443 if tls else 80)
+    host_header = parsed.netloc
+    prefix = parsed.path.rstrip("/")
+    extra = f"Cookie: {cookie}\r\n" if cookie else ""
+    queue = iter(words)
+    pacer = _Pacer(rate)
+    records = []
+
+    async def worker():
+        conn = _Connection(parsed.hostname, port, tls)
+        try:
+            for word in queue:
+                path = "/" + word.lstrip("/")
+                request = (f"GET {prefix}{path} HTTP/1.1\r\nHost: {host_header}\r\nUser-Agent: {USER_AGENT}\r\n"
+                           f"Accept: */*\r\n{extra}Connection: keep-alive\r\n\r\n").encode("latin-1")
+                await pacer.wait()
+                try:
+                    status, headers, body = await asyncio.wait_for(conn.request(request), timeout)
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError) as e:
+                    conn.close()
+                    records.append({"path": path, "status": None, "size": 0, "redirect": "", "error": str(e) or type(e).__name__})
+                    continue
+                records.append({"path": path, "status": status, "size": len(body),
+                                "redirect": headers.get("location", ""), "body": body})
+        finally:
+            conn.close()
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(words))))))
+    order = {("/" + w.lstrip("/")): i for i, w in enumerate(words)}
+    return sorted(records, key=lambda r: order.get(r["path"], 0))
+
+
+def probe_directories(url: str, wordlist: str = "url_dvwa.txt", output_file: str = DEFAULT_OUTPUT,
+                      concurrency: int = PROBE_CONCURRENCY, hide_status: str = HIDE_STATUS,
+                      timeout: float = PROBE_TIMEOUT, collapse_noise: bool = True) -> str:
+    """
+    In-process directory brute force (no Gobuster process), for short wordlists such as url_dvwa.txt.
+    Uses the cookie from header.txt, keep-alive connections and the gobuster output format.
+    hide_status: comma separated status codes left out of the results (default 404).
+    collapse_noise: fold soft-404 / login-redirect clusters into one summary line each.
+    """
+    try:
+        words = load_words(wordlist)
+    except OSError as e:
+        return f"Error reading wordlist: {e}"
+    if not words:
+        return f"Wordlist {wordlist} is empty."
+    cookie = "; ".join(f"{k}={v}" for k, v in header_cookie_pairs(HEADER_FILE))
+    hidden = {int(s) for s in str(hide_status).replace(" ", "").split(",") if s.isdigit()}
+    start = time.perf_counter()
+    # Counts as a gobuster run for the governor's per-tool / per-target slots and paces at its rate share.
+    ticket = governor.acquire(f"gobuster dir -u {url}")
+    try:
+        rate = PROBE_RATE if ticket.rate is None else ticket.rate
+        records = asyncio.run(probe_paths_async(url, words, concurrency, timeout, rate, cookie))
+    finally:
+        ticket.release()
+    seconds = time.perf_counter() - start
+    shown = [r for r in records if r["status"] is not None and r["status"] not in hidden]
+    errors = [r for r in records if r["status"] is None]
+    noise = []
+    if collapse_noise and shown:
+        lines, noise = collapse(shown, url, fetch_baselines(url, cookie), gobuster_line)
+    else:
+        lines = [gobuster_line(r) for r in shown]
+    if output_file:
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines + noise) + ("\n" if lines or noise else ""))
+    summary = f"Probed {len(words)} paths on {url} in {seconds:.2f}s: {len(shown)} result(s)"
+    if noise:
+        summary += f", {len(shown) - len(lines)} of them in {len(noise)} soft-404/login-redirect cluster(s)"
+    if errors:
+        summary += f", {len(errors)} error(s) (e.g. {errors[0]['path']}: {errors[0]['error']})"
+    if output_file:
+        summary += f", saved to {output_file}"
+    if len(lines) > MAX_RETURN_LINES:
+        lines = lines[:MAX_RETURN_LINES] + [f"... {len(lines) - MAX_RETURN_LINES} more in {output_file}"]
+    return "\n".join([summary] + lines + noise)
+
+
+if __name__ == "__main__":
+    import sys
+    print(probe_directories(sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8085",
+                            *(sys.argv[2:3] or ["url_dvwa.txt"])))
@@ -1,14 +1,22 @@
 import os
 from autogen.agentchat import AssistantAgent, ConversableAgent, UserProxyAgent, GroupChat, GroupChatManager
-from autogen.coding.local_commandline_code_executor import LocalCommandLineCodeExecutor
+from checkpoint import with_checkpoint
+from code_executors import create_code_executor, register_job_tools
+from command_validator import attach_local_validator
 from reading_function import read_file
+from findings import read_findings
+from findings_db import query_findings
+from history_compaction import attach_history_compaction
+from lazy_agents import deferred, register_llm_tool
 from report_save import save_report
+from result_cache import with_result_cache
+from speaker_selection import WorkflowSpeakerSelector
 
-def create_exploit_team(llm_config, interaction_mode):
+def create_exploit_team(llm_config, interaction_mode, executor_mode="blocking", checkpoint=None, result_cache=None):
     os.makedirs("pentest_results/exploit", exist_ok=True)
 
     # === Exploit Generator ===
-    exploit_agent = ConversableAgent(
+    exploit_agent = deferred(ConversableAgent(
         name="Exploit-Agent",
         system_message="""
     You're an exploit agent. You will be provided with a vulnerability summary report (SQLi, LFI, etc.).
@@ -17,20 +25,22 @@ def create_exploit_team(llm_config, interaction_mode):
     - LFI: use curl or wget to read sensitive files (e.g., /etc/passwd).
     Return each command in its own bash block, redirect output to pentest_results/exploit/exploit_<type>_<name>.txt
 """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode,
-    )
+    ), llm_config)
 
     # === Command Checker ===
-    checker = ConversableAgent(
+    checker = deferred(ConversableAgent(
         name="Exploit-Checker",
         system_message="Check syntax of exploit commands and ensure proper output redirection to .txt files.",
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode,
-    )
+    ), llm_config)
+    attach_local_validator(checker)
 
     # === Executor ===
-    executor = LocalCommandLineCodeExecutor(timeout=3600, work_dir=".")
+    executor = create_code_executor(executor_mode, timeout=3600, work_dir=".")
+    executor = with_checkpoint(with_result_cache(executor, result_cache), checkpoint)
     code_executor = AssistantAgent(
         name="Code-Executor",
         llm_config=False,
@@ -39,38 +49,57 @@ def create_exploit_team(llm_config, interaction_mode):
     )
 
     # === File Reader ===
-    file_reader = AssistantAgent(
+    file_reader = deferred(AssistantAgent(
         name="File-Reader",
-        system_message="Read and display exploit output files.",
-        llm_config=llm_config,
+        system_message="Read and display exploit output files. Prefer read_findings for nmap/gobuster/whatweb/nuclei results; use read_file for anything else.",
+        llm_config=False,
         human_input_mode="NEVER",
-    )
-    file_reader.register_for_llm(name="read_file", description="Read an exploit output file")(read_file)
-    file_reader.register_for_execution(name="read_file", description="Read an exploit output file")(read_file)
+    ), llm_config)
+    register_llm_tool(file_reader, name="read_file", description="Read an exploit output file (paged: offset/limit bytes, start_line/end_line, tail lines, regex pattern)")(read_file)
+    file_reader.register_for_execution(name="read_file", description="Read an exploit output file (paged: offset/limit bytes, start_line/end_line, tail lines, regex pattern)")(read_file)
+    register_llm_tool(file_reader, name="read_findings", description="Query parsed scan records (ports, paths, technologies, nuclei hits) instead of raw files")(read_findings)
+    file_reader.register_for_execution(name="read_findings")(read_findings)
+    register_llm_tool(file_reader, name="query_findings", description="Indexed query over all findings by target, tool, severity, URL or kind")(query_findings)
+    file_reader.register_for_execution(name="query_findings")(query_findings)
 
     # === Report Writer ===
-    reporter = AssistantAgent(
+    reporter = deferred(AssistantAgent(
         name="Report-Writer",
         system_message="Summarize exploit results. Do not generate code. Always call saving-report.",
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode="ALWAYS",
-    )
-    reporter.register_for_llm(name="saving-report", description="Save exploit summary report")(save_report)
+    ), llm_config)
+    register_llm_tool(reporter, name="saving-report", description="Save exploit summary report")(save_report)
     reporter.register_for_execution(name="saving-report", description="Save exploit summary report")(save_report)
+    register_llm_tool(reporter, name="query_findings", description="Indexed query over all findings by target, tool, severity, URL or kind")(query_findings)
+    reporter.register_for_execution(name="query_findings")(query_findings)
 
     # === User Proxy ===
-    user_proxy = UserProxyAgent(
+    user_proxy = deferred(UserProxyAgent(
         name="User-Proxy",
         system_message="A human analyst supervising exploitation phase.",
         is_termination_msg=lambda msg: "TERMINATE" in msg["content"],
         code_execution_config={"work_dir": ".", "use_docker": False},
         human_input_mode=interaction_mode,
-        llm_config=llm_config,
-    )
+        llm_config=False,
+    ), llm_config)
+    if executor_mode == "background":
+        register_job_tools(file_reader, user_proxy)
 
     # Assemble GroupChat
     agents = [user_proxy, exploit_agent, checker, code_executor, file_reader, reporter]
-    exploit_team = GroupChat(agents=agents, messages=[], max_round=50)
+    exploit_team = GroupChat(
+        agents=agents,
+        messages=[],
+        max_round=50,
+        speaker_selection_method=WorkflowSpeakerSelector(
+            steps=[file_reader, exploit_agent, reporter],
+            checker=checker, approver=user_proxy, executor=code_executor, reader=file_reader,
+        ),
+    )
+    attach_history_compaction(exploit_team.agents)
+    if checkpoint is not None:
+        checkpoint.track(exploit_team)
 
     # Manager coordinates exploitation steps
     manager = GroupChatManager(
@@ -0,0 +1,188 @@
+#fast_path.py
+# Non-interactive fast path: run the deterministic recon/vuln plan directly in Python
+# (no LLM turns) and hand over to the agents only for interpretation and exploit selection.
+#   python fast_path.py localhost:8085
+#   python fast_path.py http://10.0.0.5 --phases recon --plan my_plan.json --handoff
+import argparse
+import json
+import os
+import time
+from urllib.parse import urljoin, urlparse, urlsplit
+
+from findings import SEVERITY_ORDER, parse_file, severity_rank
+from port_prescan import nmap_family_flag, prescan_open_ports
+from recon_scheduler import ScanJob, run_command_graph
+from report_save import save_report
+from resolver import get_ip_from_url
+from session_cache import HEADER_FILE, header_cookie_pairs
+from url_store import canonicalize, captured_urls, signature
+
+WORDLIST = "/usr/share/wordlists/dirb/common.txt"
+VULN_TARGETS_FILE = "pentest_results/vulnscan/fast_targets.txt"
+
+# Commands are formatted with: url, host, ip, port_flag ([-6 ]-p <port> or ""), cookie, wordlist.
+DEFAULT_PLAN = {
+    "recon": [
+        {"name": "nmap", "command": "nmap -sV {port_flag} {host} -oN pentest_results/recon/nmap_scan.txt"},
+        {"name": "whatweb", "command": "whatweb -a 3 --cookie \"{cookie}\" {url} > pentest_results/recon/whatweb_scan.txt"},
+        {"name": "gobuster", "command": "gobuster dir -u {url} -w {wordlist} -c \"{cookie}\" -q -o pentest_results/recon/gobuster_scan.txt"},
+    ],
+    "vuln": [
+        {"name": "nuclei", "command": "nuclei -l " + VULN_TARGETS_FILE + " -H \"Cookie: {cookie}\" -o pentest_results/vulnscan/nuclei_fast.txt"},
+    ],
+}
+HANDOFF_MESSAGE = """Recon and vulnerability scanning were already run in fast mode; do not re-run them.
+Summary:
+{summary}
+
+Interpret these findings, select the vulnerabilities worth exploiting and exploit them. The URL is : {url}"""
+
+
+def build_context(target, wordlist=WORDLIST, header_file=HEADER_FILE):
+    url = target if "://" in target else f"http://{target}"
+    parsed = urlparse(url)
+    ip = get_ip_from_url(url)
+    return {
+        "url": url.rstrip("/"),
+        "host": parsed.hostname or "",
+        "ip": ip,
+        "port_flag": nmap_family_flag(ip) + (f"-p {parsed.port}" if parsed.port else ""),
+        "cookie": "; ".join(f"{k}={v}" for k, v in header_cookie_pairs(header_file)),
+        "wordlist": wordlist,
+    }
+
+
+def load_plan(path=""):
+    if not path:
+        return DEFAULT_PLAN
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_step_group(steps, context):
+    jobs = [
+        ScanJob(step["name"], step["command"].format(**context), step.get("depends_on") or ())
+        for step in steps
+    ]
+    run_command_graph(jobs)
+    for job in jobs:
+        print(f"    {job.name:<10} [{job.status}] exit_code={job.exit_code} {job.seconds:.1f}s")
+    return jobs
+
+
+def _records(jobs, kind):
+    records = []
+    for job in jobs:
+        for token in job.command.split():
+            if token.startswith("pentest_results/") and os.path.isfile(token):
+                records += [r for r in parse_file(token)[1] if r.kind == kind]
+    return records
+
+
+def _origin(url):
+    return urlsplit(canonicalize(url))[:2]
+
+
+def write_vuln_targets(context, recon_jobs):
+    """URL list for the vuln step: the live gobuster paths plus captured URLs on the same origin as the target."""
+    origin = _origin(context["url"])
+    urls = [context["url"]] + [
+        urljoin(context["url"] + "/", p.path.lstrip("/"))
+        for p in _records(recon_jobs, "path") if p.status < 400
+    ]
+    # captured_urls.txt is shared by every earlier run; other hosts must not be scanned here.
+    urls += [u for u in captured_urls.urls() if _origin(u) == origin]
+    unique = {}
+    for u in urls:
+        unique.setdefault(signature(u), canonicalize(u))
+    urls = list(unique.values())
+    os.makedirs(os.path.dirname(VULN_TARGETS_FILE), exist_ok=True)
+    with open(VULN_TARGETS_FILE, "w", encoding="utf-8") as f:
+        f.write("\n".join(urls) + "\n")
+    return len(urls)
+
+
+def recon_report(context, jobs):
+    lines = [f"Target: {context['host']}", f"URL: {context['url']}", f"IP: {context['ip']}", "", "Open ports:"]
+    lines += [f"- {p.compact()}" for p in _records(jobs, "port") if p.state == "open"] or ["- none found"]
+    lines += ["", "Technologies:"]
+    lines += [f"- {t.compact()}" for t in _records(jobs, "tech")] or ["- none found"]
+    lines += ["", "Paths:"]
+    lines += [f"- {p.compact()}" for p in _records(jobs, "path")] or ["- none found"]
+    return "\n".join(lines)
+
+
+def vuln_report(context, jobs):
+    vulns = sorted(_records(jobs, "vuln"), key=lambda v: -severity_rank(v.severity))
+    counts = {s: sum(1 for v in vulns if v.severity == s) for s in reversed(SEVERITY_ORDER)}
+    lines = [f"Target: {context['host']}", "Findings: " + ", ".join(f"{n} {s}" for s, n in counts.items() if n), ""]
+    lines += [f"- {v.compact()}" for v in vulns] or ["- no findings"]
+    return "\n".join(lines)
+
+
+def apply_prescan(context):
+    """Narrow nmap's -p to the ports answering a TCP connect sweep (keeps the URL port if none answer)."""
+    try:
+        open_ports, summary = prescan_open_ports(context["host"])
+    except ValueError as e:
+        print(f"    prescan skipped: {e}")
+        return
+    print(f"    prescan: {summary['scanned']} ports in {summary['seconds']}s, open: {open_ports or 'none'}")
+    if open_ports:
+        context["port_flag"] = nmap_family_flag(summary["ip"]) + "-p " + ",".join(map(str, open_ports))
+
+
+def run_fast_path(target, phases=("recon", "vuln"), plan=None, wordlist=WORDLIST, prescan=True):
+    plan = plan or DEFAULT_PLAN
+    start = time.perf_counter()
+    context = build_context(target, wordlist)
+    print(f"[+] {context['url']} -> {context['ip']} (cookie: {'yes' if context['cookie'] else 'no'})")
+    summaries, recon_jobs = [], []
+    if "recon" in phases and plan.get("recon"):
+        if prescan:
+            apply_prescan(context)
+        print("[+] Recon")
+        recon_jobs = run_step_group(plan["recon"], context)
+        text = recon_report(context, recon_jobs)
+        print("   ", save_report(text, "recon_report.txt"))
+        summaries.append(text)
+    if "vuln" in phases and plan.get("vuln"):
+        print(f"[+] Vuln scan on {write_vuln_targets(context, recon_jobs)} URL(s)")
+        vuln_jobs = run_step_group(plan["vuln"], context)
+        text = vuln_report(context, vuln_jobs)
+        print("   ", save_report(text, "vuln_scan_report.txt"))
+        summaries.append(text)
+    print(f"[+] Fast path finished in {time.perf_counter() - start:.1f}s")
+    return context, "\n\n".join(summaries)
+
+
+def hand_off(context, summary, interaction_mode="NEVER"):
+    """Let the exploit team interpret the fast-path reports and pick exploits."""
+    from exploit_team import create_exploit_team
+    from main import llm_config
+
+    team = create_exploit_team(llm_config, interaction_mode)
+    team["user_proxy"].initiate_chat(team["manager"], message=HANDOFF_MESSAGE.format(summary=summary, url=context["url"]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deterministic recon/vuln plan without LLM turns")
+    parser.add_argument("target", help="host[:port] or URL")
+    parser.add_argument("--phases", default="recon,vuln", help="comma separated: recon,vuln")
+    parser.add_argument("--plan", default="", help="JSON plan file ({\"recon\": [...], \"vuln\": [...]})")
+    parser.add_argument("--wordlist", default=WORDLIST)
+    parser.add_argument("--no-cache", action="store_true", help="do not reuse cached scan results")
+    parser.add_argument("--no-prescan", action="store_true", help="give nmap the URL port instead of the pre-scanned open ports")
+    parser.add_argument("--handoff", action="store_true", help="hand the reports to the exploit team afterwards")
+    parser.add_argument("--interaction-mode", default="NEVER", choices=["NEVER", "ALWAYS", "TERMINATE"])
+    args = parser.parse_args()
+
+    for directory in ("pentest_results/recon", "pentest_results/vulnscan", "pentest_results/exploit", "pentest_results/reports"):
+        os.makedirs(directory, exist_ok=True)
+    if not args.no_cache:
+        from result_cache import ResultCache
+        ResultCache().activate()
+    ctx, summary = run_fast_path(args.target, tuple(p.strip() for p in args.phases.split(",")),
+                                 load_plan(args.plan), args.wordlist, prescan=not args.no_prescan)
+    if args.handoff:
+        hand_off(ctx, summary, args.interaction_mode)
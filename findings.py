@@ -0,0 +1,234 @@
+#findings.py
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+
+RESULTS_DIR = "pentest_results"
+SEVERITY_ORDER = ["info", "low", "medium", "high", "critical"]
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*m")
+_NMAP_HOST_RE = re.compile(r"^Nmap scan report for (\S+)(?: \(([^)]+)\))?")
+_NMAP_PORT_RE = re.compile(r"^(\d+)/(tcp|udp)\s+(\S+)\s+(\S+)(?:\s+(.*))?$")
+_GOBUSTER_RE = re.compile(r"^(\S+)\s+\(Status:\s*(\d+)\)(?:\s*\[Size:\s*(\d+)\])?(?:\s*\[-->\s*([^\]]+)\])?")
+_WHATWEB_RE = re.compile(r"^(\S+)\s+\[(\d+)[^\]]*\]\s*(.*)$")
+_NUCLEI_RE = re.compile(r"^\[([^\]]+)\]\s+\[([^\]]+)\]\s+\[([^\]]+)\]\s+(\S+)\s*(.*)$")
+
+
+@dataclass(slots=True, frozen=True)
+class PortFinding:
+    host: str
+    port: int
+    proto: str
+    state: str
+    service: str
+    version: str = ""
+    kind: str = field(default="port", init=False)
+
+    def compact(self):
+        return f"{self.host} {self.port}/{self.proto} {self.state} {self.service} {self.version}".rstrip()
+
+
+@dataclass(slots=True, frozen=True)
+class PathFinding:
+    path: str
+    status: int
+    size: Optional[int] = None
+    redirect: str = ""
+    kind: str = field(default="path", init=False)
+
+    def compact(self):
+        size = "-" if self.size is None else self.size
+        return f"{self.path} {self.status} {size}" + (f" -> {self.redirect}" if self.redirect else "")
+
+
+@dataclass(slots=True, frozen=True)
+class TechFinding:
+    url: str
+    status: int
+    plugins: Tuple[str, ...] = ()
+    kind: str = field(default="tech", init=False)
+
+    def compact(self):
+        return f"{self.url} {self.status} " + ", ".join(self.plugins)
+
+
+@dataclass(slots=True, frozen=True)
+class VulnFinding:
+    template: str
+    protocol: str
+    severity: str
+    url: str
+    extra: str = ""
+    kind: str = field(default="vuln", init=False)
+
+    def compact(self):
+        return f"[{self.severity}] {self.template} {self.url}" + (f" {self.extra}" if self.extra else "")
+
+
+def severity_rank(severity):
+    severity = (severity or "").lower()
+    return SEVERITY_ORDER.index(severity) if severity in SEVERITY_ORDER else -1
+
+
+def parse_nmap(text):
+    records, host = [], ""
+    for line in text.splitlines():
+        m = _NMAP_HOST_RE.match(line)
+        if m:
+            host = m.group(2) or m.group(1)
+            continue
+        m = _NMAP_PORT_RE.match(line.strip())
+        if m:
+            port, proto, state, service, version = m.groups()
+            records.append(PortFinding(host, int(port), proto, state, service, (version or "").strip()))
+    return records
+
+
+def parse_gobuster(text):
+    records = []
+    for line in text.splitlines():
+        m = _GOBUSTER_RE.match(line.strip())
+        if m:
+            path, status, size, redirect = m.groups()
+            records.append(PathFinding(path, int(status), int(size) if size else None, (redirect or "").strip()))
+    return records
+
+
+def _split_plugins(text):
+    # Split on ", " outside of [...] so `HTTPServer[Debian Linux][Apache/2.4.25 (Debian)]` stays whole.
+    parts, depth, current = [], 0, ""
+    for ch in text:
+        depth += ch == "["
+        depth -= ch == "]"
+        if ch == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+        else:
+            current += ch
+    if current.strip():
+        parts.append(current.strip())
+    return tuple(parts)
+
+
+def parse_whatweb(text):
+    records = []
+    for line in _ANSI_RE.sub("", text).splitlines():
+        m = _WHATWEB_RE.match(line.strip())
+        if m:
+            url, status, rest = m.groups()
+            records.append(TechFinding(url, int(status), _split_plugins(rest)))
+    return records
+
+
+def parse_nuclei(text):
+    records = []
+    for line in _ANSI_RE.sub("", text).splitlines():
+        m = _NUCLEI_RE.match(line.strip())
+        if m:
+            template, protocol, severity, url, extra = m.groups()
+            records.append(VulnFinding(template, protocol, severity.lower(), url, extra.strip()))
+    return records
+
+
+PARSERS = {
+    "nmap": parse_nmap,
+    "gobuster": parse_gobuster,
+    "whatweb": parse_whatweb,
+    "nuclei": parse_nuclei,
+}
+
+
+def tool_for_file(path):
+    name = os.path.basename(path).lower()
+    for tool in PARSERS:
+        if name.startswith(tool):
+            return tool
+    return None
+
+
+def parse_file(path):
+    tool = tool_for_file(path)
+    if tool is None:
+        return None, []
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return tool, PARSERS[tool](f.read())
+
+
+class FindingsStore:
+    """
+    Parsed records of every scan artifact under RESULTS_DIR, grouped by
+    source file. Files are re-parsed only when their mtime/size change.
+    """
+
+    def __init__(self, root=RESULTS_DIR):
+        self.root = root
+        self._files = {}   # path -> (mtime, size, tool, records)
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        seen = set()
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if tool_for_file(path) is None:
+                    continue
+                seen.add(path)
+                self._load(path)
+        with self._lock:
+            for path in set(self._files) - seen:
+                del self._files[path]
+
+    def _load(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        with self._lock:
+            cached = self._files.get(path)
+            if cached and cached[0] == st.st_mtime and cached[1] == st.st_size:
+                return
+        tool, records = parse_file(path)
+        with self._lock:
+            self._files[path] = (st.st_mtime, st.st_size, tool, records)
+
+    def query(self, kind=None, source=None, min_severity=None, contains=None):
+        self.refresh()
+        min_rank = severity_rank(min_severity) if min_severity else None
+        with self._lock:
+            files = list(self._files.items())
+        results = []
+        for path, (_, _, tool, records) in sorted(files):
+            if source and os.path.basename(source) != os.path.basename(path) and source != tool:
+                continue
+            for record in records:
+                if kind and record.kind != kind:
+                    continue
+                if min_rank is not None and (record.kind != "vuln" or severity_rank(record.severity) < min_rank):
+                    continue
+                if contains and contains not in record.compact():
+                    continue
+                results.append((path, record))
+        return results
+
+
+findings_store = FindingsStore()
+
+
+def read_findings(file_name: str = "", kind: str = "", min_severity: str = "", contains: str = "") -> str:
+    """
+    Compact parsed records instead of raw scan output.
+    file_name: a result file (e.g. nmap_scan.txt) or tool name (nmap/gobuster/whatweb/nuclei); empty = all.
+    kind: port | path | tech | vuln. min_severity: info..critical (nuclei only).
+    """
+    results = findings_store.query(kind or None, file_name or None, min_severity or None, contains or None)
+    if not results:
+        return "No findings matched."
+    lines, current = [], None
+    for path, record in results:
+        if path != current:
+            current = path
+            lines.append(f"# {path}")
+        lines.append(record.compact())
+    return "\n".join(lines)
@@ -0,0 +1,223 @@
+#findings_db.py
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import asdict
+from urllib.parse import urljoin, urlparse
+
+from findings import RESULTS_DIR, SEVERITY_ORDER, parse_file, severity_rank, tool_for_file
+
+DB_PATH = os.path.join(RESULTS_DIR, "findings.db")
+CAPTURED_URLS_FILE = "captured_urls.txt"
+INDEXED_DIRS = ("recon", "vulnscan", "exploit", "reports")
+# Kind of an unparsed text artifact, by the directory it was saved in (anything else is "raw").
+TEXT_KINDS = {"recon": "recon", "vulnscan": "vulnscan", "exploit": "exploit", "reports": "report"}
+QUERY_LIMIT = 50
+INDEX_VERSION = 2      # bump when row derivation changes; older databases are re-indexed from scratch
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS findings (
+    id INTEGER PRIMARY KEY,
+    target TEXT,
+    tool TEXT,
+    kind TEXT,
+    severity TEXT,
+    url TEXT,
+    summary TEXT,
+    data TEXT,
+    source TEXT,
+    ts REAL
+);
+CREATE INDEX IF NOT EXISTS idx_findings_target ON findings(target);
+CREATE INDEX IF NOT EXISTS idx_findings_tool ON findings(tool);
+CREATE INDEX IF NOT EXISTS idx_findings_severity ON findings(severity);
+CREATE INDEX IF NOT EXISTS idx_findings_url ON findings(url);
+CREATE INDEX IF NOT EXISTS idx_findings_ts ON findings(ts);
+CREATE INDEX IF NOT EXISTS idx_findings_source ON findings(source);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    mtime REAL,
+    size INTEGER
+);
+"""
+
+_write_lock = threading.Lock()
+
+
+def _connect(db_path=DB_PATH):
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    if conn.execute("PRAGMA user_version").fetchone()[0] < INDEX_VERSION:
+        with _write_lock, conn:
+            conn.execute("DELETE FROM findings")
+            conn.execute("DELETE FROM sources")
+        conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+    return conn
+
+
+def _netloc(url):
+    return urlparse(url if "://" in url else f"http://{url}").netloc
+
+
+def _first_line(text):
+    for line in text.splitlines():
+        if line.strip():
+            return line.strip()[:300]
+    return ""
+
+
+def _rows_for_scan(path, tool, records, ts, default_target):
+    rows = []
+    for record in records:
+        url, severity = "", None
+        if record.kind == "port":
+            target = f"{record.host}:{record.port}"
+        elif record.kind == "path":
+            target = default_target
+            url = urljoin(f"http://{default_target}/", record.path.lstrip("/")) if default_target else record.path
+        else:
+            url = record.url
+            target = _netloc(url)
+            severity = getattr(record, "severity", None)
+        rows.append((target, tool, record.kind, severity, url, record.compact(), json.dumps(asdict(record)), path, ts))
+    return rows
+
+
+def _rows_for_text(path, text, ts):
+    name = os.path.basename(path)
+    first = _first_line(text)
+    if path.endswith(CAPTURED_URLS_FILE):
+        return [
+            (_netloc(line), "capture", "url", None, line, line, None, path, ts)
+            for line in dict.fromkeys(l.strip() for l in text.splitlines()) if line
+        ]
+    target = first.split(":", 1)[1].strip() if first.lower().startswith("target:") else ""
+    kind = TEXT_KINDS.get(os.path.basename(os.path.dirname(path)), "raw")
+    # hakrawler_scan.txt -> hakrawler, exploit_lfi_fi.txt -> exploit; reports keep tool "report".
+    tool = "report" if kind == "report" else (os.path.splitext(name)[0].split("_")[0].lower() or "raw")
+    return [(target, tool, kind, None, "", f"{name}: {first}", None, path, ts)]
+
+
+def _guess_target(conn):
+    row = conn.execute(
+        "SELECT target, COUNT(*) AS n FROM findings WHERE target != '' AND kind IN ('tech', 'vuln', 'url') "
+        "GROUP BY target ORDER BY n DESC LIMIT 1"
+    ).fetchone()
+    return row[0] if row else ""
+
+
+def _source_files(root=RESULTS_DIR):
+    for sub in INDEXED_DIRS:
+        base = os.path.join(root, sub)
+        if not os.path.isdir(base):
+            continue
+        for name in sorted(os.listdir(base)):
+            path = os.path.join(base, name)
+            if os.path.isfile(path):
+                yield path
+    if os.path.exists(CAPTURED_URLS_FILE):
+        yield CAPTURED_URLS_FILE
+
+
+def ingest_file(path, conn=None, default_target=""):
+    """(Re)index one artifact; rows from a previous version of the file are replaced."""
+    own = conn is None
+    conn = conn or _connect()
+    try:
+        st = os.stat(path)
+        tool = tool_for_file(path)
+        if tool is not None:
+            _, records = parse_file(path)
+            rows = _rows_for_scan(path, tool, records, st.st_mtime, default_target or _guess_target(conn))
+        else:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                rows = _rows_for_text(path, f.read(), st.st_mtime)
+        with _write_lock, conn:
+            conn.execute("DELETE FROM findings WHERE source = ?", (path,))
+            conn.executemany(
+                "INSERT INTO findings (target, tool, kind, severity, url, summary, data, source, ts) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO sources (path, mtime, size) VALUES (?, ?, ?)",
+                         (path, st.st_mtime, st.st_size))
+        return len(rows)
+    finally:
+        if own:
+            conn.close()
+
+
+def sync(root=RESULTS_DIR, conn=None):
+    """Ingest new or changed artifacts and drop rows of deleted ones. Returns the number of files indexed."""
+    own = conn is None
+    conn = conn or _connect()
+    try:
+        known = {path: (mtime, size) for path, mtime, size in conn.execute("SELECT path, mtime, size FROM sources")}
+        paths = list(_source_files(root))
+        # Tech/vuln/capture files first so gobuster paths can borrow their target.
+        paths.sort(key=lambda p: tool_for_file(p) == "gobuster")
+        changed = 0
+        for path in paths:
+            st = os.stat(path)
+            if known.pop(path, None) == (st.st_mtime, st.st_size):
+                continue
+            ingest_file(path, conn)
+            changed += 1
+        with _write_lock, conn:
+            for path in known:
+                conn.execute("DELETE FROM findings WHERE source = ?", (path,))
+                conn.execute("DELETE FROM sources WHERE path = ?", (path,))
+        return changed
+    finally:
+        if own:
+            conn.close()
+
+
+def query_findings(target: str = "", tool: str = "", severity: str = "", min_severity: str = "",
+                   url_contains: str = "", kind: str = "", limit: int = QUERY_LIMIT) -> str:
+    """
+    Indexed query over every scan output, captured URL and saved report.
+    target: host[:port] (e.g. localhost:8085). tool: nmap/whatweb/gobuster/nuclei/capture/report, or the
+    file-name prefix of other artifacts (hakrawler, sqlmap, exploit, ...).
+    severity: exact nuclei severity; min_severity: that severity or worse.
+    kind: port | path | tech | vuln | url | recon | vulnscan | exploit | report | raw
+    (the last five are unparsed text files, by the directory they were saved in).
+    """
+    conn = _connect()
+    try:
+        sync(conn=conn)
+        clauses, params = [], []
+        if target:
+            clauses.append("target LIKE ?")
+            params.append(f"%{target}%")
+        if tool:
+            clauses.append("tool = ?")
+            params.append(tool.lower())
+        if severity:
+            clauses.append("severity = ?")
+            params.append(severity.lower())
+        if min_severity:
+            allowed = SEVERITY_ORDER[max(severity_rank(min_severity), 0):]
+            clauses.append(f"severity IN ({', '.join('?' * len(allowed))})")
+            params += allowed
+        if url_contains:
+            clauses.append("url LIKE ?")
+            params.append(f"%{url_contains}%")
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind.lower())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = conn.execute(
+            f"SELECT tool, target, summary FROM findings {where} ORDER BY ts DESC, id LIMIT ?",
+            params + [max(1, limit)],
+        ).fetchall()
+        total = conn.execute(f"SELECT COUNT(*) FROM findings {where}", params).fetchone()[0]
+    finally:
+        conn.close()
+    if not rows:
+        return "No findings matched."
+    lines = [f"{len(rows)} of {total} finding(s)"]
+    lines.extend(f"[{tool}] {target} {summary}" for tool, target, summary in rows)
+    return "\n".join(lines)
+
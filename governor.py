@@ -0,0 +1,229 @@
+#governor.py
+import os
+import re
+import shlex
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# Concurrent processes per tool (shared by all targets of this process, or the whole campaign).
+TOOL_SLOTS = {
+    "nmap": 2,
+    "whatweb": 4,
+    "gobuster": 2,
+    "hakrawler": 2,
+    "nuclei": 1,
+    "sqlmap": 1,
+}
+TARGET_SLOTS = 3            # concurrent scanner processes against one host
+# Request budget per tool and host (requests/s), split evenly between the most commands of that tool
+# that can run against one host at once (min of its TOOL_SLOTS and TARGET_SLOTS), so the sum stays under it.
+RATE_LIMITS = {
+    "nmap": 300,
+    "gobuster": 50,
+    "nuclei": 50,
+    "sqlmap": 10,
+}
+MAX_LOAD = 0.9              # 1-min load average per CPU above which new commands wait
+MIN_FREE_MB = 512           # MemAvailable below which new commands wait
+ADMISSION_POLL = 1.0
+ADMISSION_TIMEOUT = 300     # never hold a command back longer than this
+
+_URL_RE = re.compile(r"https?://[^\s'\"|;&<>]+")
+_HOST_RE = re.compile(r"^(localhost|\d{1,3}(?:\.\d{1,3}){3}|[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)+)(?::(\d+))?$")
+_FILE_EXT_RE = re.compile(r"\.(txt|json|jsonl|xml|ya?ml|html?|log|csv|gnmap|nmap)$", re.IGNORECASE)
+_THREADS_RE = {
+    "gobuster": re.compile(r"(?:-t|--threads)[ =](\d+)"),
+    "sqlmap": re.compile(r"--threads[ =](\d+)"),
+}
+
+
+def _tokens(command):
+    try:
+        return shlex.split(command)
+    except ValueError:
+        return command.split()
+
+
+def command_tool(command):
+    tokens = [t for t in _tokens(command) if t != "sudo"]
+    return os.path.basename(tokens[0]) if tokens else ""
+
+
+def command_target(command):
+    """host[:port] or URL the command points at ("" if none is recognisable)."""
+    match = _URL_RE.search(command)
+    if match:
+        return match.group(0)
+    for token in _tokens(command)[1:]:
+        if not token.startswith("-") and "/" not in token and not _FILE_EXT_RE.search(token) and _HOST_RE.match(token):
+            return token
+    return ""
+
+
+def scanner_of(command):
+    """The governed tool of a command, looking through pipes (`cat urls.txt | nuclei ...`)."""
+    for segment in command.split("|"):
+        tool = command_tool(segment)
+        if tool in TOOL_SLOTS or tool in RATE_LIMITS:
+            return tool
+    return command_tool(command)
+
+
+def target_host(command):
+    target = command_target(command)
+    if not target:
+        return ""
+    return urlparse(target if "://" in target else f"http://{target}").hostname or ""
+
+
+def _rate_flag(tool, command, rate):
+    if tool == "nuclei":
+        return None if re.search(r"\s-(?:rl|rate-limit)\b|--rate-limit\b", command) else f"-rl {max(1, int(rate))}"
+    if tool == "nmap":
+        return None if "--max-rate" in command else f"--max-rate {max(1, int(rate))}"
+    if tool in ("gobuster", "sqlmap"):
+        if "--delay" in command:
+            return None
+        match = _THREADS_RE[tool].search(command)
+        threads = int(match.group(1)) if match else (10 if tool == "gobuster" else 1)
+        delay = threads / max(rate, 0.1)
+        return f"--delay {int(delay * 1000)}ms" if tool == "gobuster" else f"--delay {delay:.2f}"
+    return None
+
+
+def inject_rate_flag(command, tool, rate):
+    """Append the tool's own rate flag to every invocation of `tool`, before any pipe or redirect."""
+    flag = _rate_flag(tool, command, rate)
+    if flag is None:
+        return command
+    pattern = re.compile(rf"((?:^|[|;&]\s*|\n\s*)(?:sudo\s+)?{re.escape(tool)}\b(?:'[^']*'|\"[^\"]*\"|[^|;&>\n'\"])*?)"
+                         rf"(?=\s*(?:\d?>|[|;&\n]|$))")
+    return pattern.sub(lambda m: f"{m.group(1)} {flag}", command)
+
+
+def system_pressure():
+    """Reason to hold new commands back (CPU load or low memory), or None."""
+    try:
+        load = os.getloadavg()[0] / (os.cpu_count() or 1)
+        if load > MAX_LOAD:
+            return f"load {load:.2f}/cpu"
+    except (AttributeError, OSError):
+        pass
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    free_mb = int(line.split()[1]) // 1024
+                    if free_mb < MIN_FREE_MB:
+                        return f"{free_mb} MB free"
+                    break
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class Ticket:
+    """An admitted command: holds its slots until release()."""
+
+    def __init__(self, governor, command, tool, host, slots, rate=None):
+        self.governor = governor
+        self.command = command
+        self.rate = rate            # requests/s assigned to this command (None: tool is not rate-limited)
+        self.tool = tool
+        self.host = host
+        self._slots = slots
+        self._released = False
+
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        for slot in reversed(self._slots):
+            slot.release()
+        self.governor._finished(self.tool, self.host)
+
+
+class Governor:
+    """
+    Admission control around scanner subprocesses: per-tool and per-target
+    concurrency slots, a per-host request budget written into each tool's
+    rate flag, and waiting while the scan box is short on CPU or memory.
+    """
+
+    def __init__(self, tool_slots=None, target_slots=TARGET_SLOTS, rates=None):
+        slots = TOOL_SLOTS if tool_slots is None else tool_slots
+        self.tool_slots = {tool: threading.BoundedSemaphore(n) for tool, n in slots.items() if n > 0}
+        self.tool_counts = {tool: n for tool, n in slots.items() if n > 0}
+        self.target_slots = target_slots
+        self.rates = dict(RATE_LIMITS if rates is None else rates)
+        self._targets = {}
+        self._running = {}
+        self._lock = threading.Lock()
+
+    def set_tool_limits(self, limits, counts=None):
+        """Replace the per-tool slots, e.g. with semaphores shared by every campaign worker (counts: their sizes)."""
+        self.tool_slots = dict(limits)
+        if counts is not None:
+            self.tool_counts = {tool: n for tool, n in counts.items() if n > 0}
+
+    def rate_share(self, tool, host):
+        """Requests/s one `tool` command against `host` may use: the budget over its maximum concurrency there."""
+        concurrency = self.tool_counts.get(tool, self.target_slots)
+        if host:
+            concurrency = min(concurrency, self.target_slots)
+        return self.rates[tool] / max(1, concurrency)
+
+    def _target_slot(self, host):
+        with self._lock:
+            if host not in self._targets:
+                self._targets[host] = threading.BoundedSemaphore(self.target_slots)
+            return self._targets[host]
+
+    def _finished(self, tool, host):
+        with self._lock:
+            self._running[(tool, host)] -= 1
+
+    def _wait_for_resources(self):
+        waited = 0.0
+        while waited < ADMISSION_TIMEOUT:
+            with self._lock:
+                busy = any(self._running.values())
+            if not busy or system_pressure() is None:
+                return
+            time.sleep(ADMISSION_POLL)
+            waited += ADMISSION_POLL
+
+    def acquire(self, command):
+        """Block until the command may start; returns a Ticket whose .command carries the injected rate flag."""
+        tool, host = scanner_of(command), target_host(command)
+        self._wait_for_resources()
+        slots = []
+        tool_slot = self.tool_slots.get(tool)
+        if tool_slot is not None:
+            tool_slot.acquire()
+            slots.append(tool_slot)
+        if host and (tool in self.tool_slots or tool in self.rates):
+            target_slot = self._target_slot(host)
+            target_slot.acquire()
+            slots.append(target_slot)
+        with self._lock:
+            self._running[(tool, host)] = self._running.get((tool, host), 0) + 1
+        rate = None
+        if tool in self.rates:
+            # A fixed share: commands already running keep theirs, so the per-host sum never exceeds the budget.
+            rate = self.rate_share(tool, host)
+            command = inject_rate_flag(command, tool, rate)
+        return Ticket(self, command, tool, host, slots, rate)
+
+    @contextmanager
+    def admit(self, command):
+        ticket = self.acquire(command)
+        try:
+            yield ticket.command
+        finally:
+            ticket.release()
+
+
+governor = Governor()
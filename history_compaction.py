@@ -0,0 +1,136 @@
+#history_compaction.py
+import copy
+import re
+
+from autogen.token_count_utils import count_token
+
+RECENT_WINDOW = 12          # last N messages are always sent verbatim
+COMPACT_THRESHOLD = 1500    # older messages longer than this (chars) are replaced by a summary
+TOKEN_BUDGET = 12000        # default per-agent prompt budget for the history
+AGENT_BUDGETS = {
+    "Exploit-Agent": 6000,
+    "Report-Writer": 8000,
+}
+
+CHARS_PER_TOKEN = 4         # estimate used when the tiktoken encoding is not available (offline)
+USE_TIKTOKEN = True         # switched off after the first failed encoding download
+
+_PATH_RE = re.compile(r"pentest_results/[\w./-]+")
+_EXITCODE_RE = re.compile(r"^exitcode: (-?\d+)")
+
+
+def summarize_output(text, name=""):
+    """Short structured stand-in for a long tool/command output."""
+    lines = [l.strip() for l in text.splitlines() if l.strip()]
+    head = lines[0][:200] if lines else ""
+    parts = [f"[compacted {name + ' ' if name else ''}output: {len(text)} chars, {len(lines)} lines]"]
+    match = _EXITCODE_RE.match(head)
+    if match:
+        parts.append(f"exitcode: {match.group(1)}")
+    elif head:
+        parts.append(f"first line: {head}")
+    paths = list(dict.fromkeys(_PATH_RE.findall(text)))
+    if paths:
+        parts.append("files: " + ", ".join(paths[:10]))
+    parts.append("Use read_findings/query_findings or read_file for the details.")
+    return "\n".join(parts)
+
+
+def _compact(message):
+    message = copy.copy(message)
+    name = message.get("name", "")
+    content = message.get("content")
+    if isinstance(content, str) and len(content) > COMPACT_THRESHOLD:
+        message["content"] = summarize_output(content, name)
+    if message.get("tool_responses"):
+        responses = []
+        for response in message["tool_responses"]:
+            response = dict(response)
+            if isinstance(response.get("content"), str) and len(response["content"]) > COMPACT_THRESHOLD:
+                response["content"] = summarize_output(response["content"], name)
+            responses.append(response)
+        message["tool_responses"] = responses
+    return message
+
+
+def _count(text):
+    global USE_TIKTOKEN
+    if USE_TIKTOKEN:
+        try:
+            return count_token(text)
+        except Exception:
+            # tiktoken downloads its encoding on first use; without network, estimate from then on.
+            USE_TIKTOKEN = False
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _tokens(message):
+    total = _count(message.get("content") or "")
+    for response in message.get("tool_responses") or []:
+        total += _count(response.get("content") or "")
+    return total
+
+
+def compact_history(messages, window=RECENT_WINDOW, max_tokens=TOKEN_BUDGET):
+    """
+    Keep the first message (the task) and the last `window` messages verbatim,
+    summarize long outputs in between, then drop the oldest middle messages
+    until the history fits in `max_tokens`. If the window alone is still over
+    the budget, its long outputs are summarized too, oldest first.
+    """
+    if not messages:
+        return messages
+    first, middle, recent = messages[0], messages[1:-window] if len(messages) > window + 1 else [], messages[1:][-window:]
+    middle = [_compact(m) for m in middle]
+
+    used = _tokens(first) + sum(_tokens(m) for m in recent)
+    if used > max_tokens:
+        recent = list(recent)
+        for i, message in enumerate(recent):
+            if used <= max_tokens:
+                break
+            recent[i] = _compact(message)
+            used += _tokens(recent[i]) - _tokens(message)
+    if not middle:
+        return [first] + recent
+    sizes = [_tokens(m) for m in middle]
+    total = used + sum(sizes)
+    start = 0
+    while start < len(middle) and total > max_tokens:
+        total -= sizes[start]
+        start += 1
+    # Don't leave tool responses whose tool call was dropped.
+    while start < len(middle) and middle[start].get("role") == "tool":
+        start += 1
+    kept = middle[start:]
+    if not kept:
+        while recent and recent[0].get("role") == "tool":
+            recent = recent[1:]
+    if start:
+        kept.insert(0, {"role": "user", "name": "History", "content": f"[{start} earlier message(s) omitted]"})
+    return [first] + kept + recent
+
+
+def attach_history_compaction(agents, window=RECENT_WINDOW, budgets=None, default_budget=TOKEN_BUDGET):
+    """Register compact_history on every LLM-backed agent, with a per-agent token budget."""
+    budgets = {**AGENT_BUDGETS, **(budgets or {})}
+    for agent in agents:
+        if not getattr(agent, "llm_config", False):
+            continue
+        budget = budgets.get(agent.name, default_budget)
+        agent.register_hook(
+            "process_all_messages_before_reply",
+            lambda messages, budget=budget: compact_history(messages, window, budget),
+        )
+
+
+if __name__ == "__main__":
+    # Self-check: a window of large tool outputs is summarized down to the agent's budget.
+    output = "\n".join(f"{n}/tcp open http Apache httpd 2.4.{n} pentest_results/recon/nmap_scan.txt" for n in range(600))
+    history = [{"role": "user", "content": "Pentest http://localhost:8085"}]
+    history += [{"role": "tool", "name": "Code-Executor", "content": f"exitcode: 0\n{output}"} for _ in range(RECENT_WINDOW)]
+    for name, budget in AGENT_BUDGETS.items():
+        compacted = compact_history(history, max_tokens=budget)
+        used = sum(_tokens(m) for m in compacted)
+        assert used <= budget, f"{name}: {used} tokens > {budget}"
+        print(f"{name}: {sum(_tokens(m) for m in history)} -> {used} tokens (budget {budget})")
@@ -0,0 +1,185 @@
+#instrumentation.py
+import functools
+import json
+import os
+import resource
+import threading
+import time
+from collections import defaultdict
+
+REPORT_DIR = "pentest_results/reports"
+
+
+def prices_from_config(config_list):
+    """{model: (prompt_price, completion_price)} per 1K tokens from the `price` field of config_list."""
+    prices = {}
+    for config in config_list or []:
+        price = config.get("price")
+        if price and len(price) == 2:
+            prices[config.get("model", "")] = (float(price[0]), float(price[1]))
+    return prices
+
+
+def _usage(agent):
+    """(prompt_tokens, completion_tokens) billed so far per model for an agent's OpenAIWrapper."""
+    client = getattr(agent, "client", None)
+    summary = getattr(client, "actual_usage_summary", None) or {}
+    return {
+        model: (u.get("prompt_tokens", 0), u.get("completion_tokens", 0))
+        for model, u in summary.items() if isinstance(u, dict)
+    }
+
+
+def _children_cpu():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class Instrumentation:
+    """
+    Records wall time, tokens, cost and CPU time of agent replies, tool calls and
+    executed commands to pentest_results/reports/perf_<run_id>.jsonl, and writes a
+    summary table (perf_<run_id>.txt) grouped by kind and name.
+    """
+
+    def __init__(self, config_list=None, run_id=None, report_dir=REPORT_DIR):
+        self.run_id = run_id or time.strftime("%Y%m%d_%H%M%S")
+        self.prices = prices_from_config(config_list)
+        self.report_dir = report_dir
+        self.events_path = os.path.join(report_dir, f"perf_{self.run_id}.jsonl")
+        self.summary_path = os.path.join(report_dir, f"perf_{self.run_id}.txt")
+        self.events = []
+        self._lock = threading.Lock()
+        os.makedirs(report_dir, exist_ok=True)
+
+    def cost(self, model, tokens_in, tokens_out):
+        price = self.prices.get(model)
+        if price is None:
+            # Azure/OpenAI return dated model names (gpt-4.1-2025-04-14).
+            price = next((p for m, p in self.prices.items() if m and model.startswith(m)), (0.0, 0.0))
+        return (tokens_in * price[0] + tokens_out * price[1]) / 1000
+
+    def record(self, kind, name, wall, cpu=0.0, agent="", tokens_in=0, tokens_out=0, cost=0.0, **extra):
+        event = {
+            "ts": time.time(), "run": self.run_id, "kind": kind, "name": name, "agent": agent,
+            "wall_s": round(wall, 4), "cpu_s": round(cpu, 4),
+            "tokens_in": tokens_in, "tokens_out": tokens_out, "cost": round(cost, 6),
+        }
+        event.update(extra)
+        with self._lock:
+            self.events.append(event)
+            with open(self.events_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(event, default=str) + "\n")
+
+    # --- hooks -------------------------------------------------------------
+
+    def _wrap_reply(self, agent):
+        original = agent.generate_reply
+
+        @functools.wraps(original)
+        def generate_reply(*args, **kwargs):
+            before, start, cpu = _usage(agent), time.perf_counter(), time.thread_time()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                tokens_in = tokens_out = 0
+                cost = 0.0
+                for model, (p, c) in _usage(agent).items():
+                    p0, c0 = before.get(model, (0, 0))
+                    tokens_in += p - p0
+                    tokens_out += c - c0
+                    cost += self.cost(model, p - p0, c - c0)
+                self.record("reply", agent.name, time.perf_counter() - start, time.thread_time() - cpu,
+                            agent=agent.name, tokens_in=tokens_in, tokens_out=tokens_out, cost=cost)
+
+        agent.generate_reply = generate_reply
+
+    def _wrap_tool(self, agent, name, func):
+        @functools.wraps(func)
+        def tool(*args, **kwargs):
+            start, cpu, children = time.perf_counter(), time.thread_time(), _children_cpu()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record("tool", name, time.perf_counter() - start,
+                            time.thread_time() - cpu + _children_cpu() - children, agent=agent.name)
+
+        return tool
+
+    def _wrap_commands(self, agent, executor):
+        original = executor.execute_code_blocks
+
+        @functools.wraps(original)
+        def execute_code_blocks(code_blocks):
+            start, children = time.perf_counter(), _children_cpu()
+            result = original(code_blocks)
+            command = "\n".join(block.code.strip() for block in code_blocks)
+            # Children CPU is process-wide: concurrent commands are attributed to whichever finishes last.
+            self.record("command", command.split()[0] if command.split() else "", time.perf_counter() - start,
+                        _children_cpu() - children, agent=agent.name, command=command[:500],
+                        exit_code=getattr(result, "exit_code", None))
+            return result
+
+        executor.execute_code_blocks = execute_code_blocks
+
+    def _wrap_run_code(self, agent):
+        original = agent.run_code
+
+        @functools.wraps(original)
+        def run_code(code, **kwargs):
+            start, children = time.perf_counter(), _children_cpu()
+            result = original(code, **kwargs)
+            self.record("command", code.split()[0] if code.split() else "", time.perf_counter() - start,
+                        _children_cpu() - children, agent=agent.name, command=code.strip()[:500],
+                        exit_code=result[0] if isinstance(result, tuple) else None)
+            return result
+
+        agent.run_code = run_code
+
+    def attach(self, agents):
+        """Instrument replies, registered tools and code execution of every agent."""
+        for agent in agents:
+            self._wrap_reply(agent)
+            functions = dict(getattr(agent, "function_map", {}) or {})
+            if functions:
+                agent.register_function({name: self._wrap_tool(agent, name, f) for name, f in functions.items()})
+            executor = getattr(agent, "_code_executor", None)
+            if executor is not None:
+                self._wrap_commands(agent, executor)
+            elif getattr(agent, "_code_execution_config", False):
+                self._wrap_run_code(agent)
+        return self
+
+    # --- report ------------------------------------------------------------
+
+    def summary_rows(self):
+        groups = defaultdict(lambda: {"count": 0, "wall_s": 0.0, "cpu_s": 0.0, "tokens_in": 0, "tokens_out": 0, "cost": 0.0})
+        for e in self.events:
+            g = groups[(e["kind"], e["name"])]
+            g["count"] += 1
+            for key in ("wall_s", "cpu_s", "tokens_in", "tokens_out", "cost"):
+                g[key] += e[key]
+        return sorted(((k, n, g) for (k, n), g in groups.items()), key=lambda row: -row[2]["wall_s"])
+
+    def format_summary(self):
+        rows = self.summary_rows()
+        total_wall = sum(g["wall_s"] for k, _, g in rows if k == "reply") or 1.0
+        lines = [
+            f"Performance report {self.run_id}",
+            f"{'kind':<8} {'name':<28} {'count':>5} {'wall_s':>9} {'%reply':>6} {'cpu_s':>8} {'tok_in':>8} {'tok_out':>8} {'cost_$':>9}",
+        ]
+        for kind, name, g in rows:
+            share = f"{100 * g['wall_s'] / total_wall:.0f}%" if kind == "reply" else ""
+            lines.append(f"{kind:<8} {name[:28]:<28} {g['count']:>5} {g['wall_s']:>9.1f} {share:>6} {g['cpu_s']:>8.1f} "
+                         f"{g['tokens_in']:>8} {g['tokens_out']:>8} {g['cost']:>9.4f}")
+        replies = [g for k, _, g in rows if k == "reply"]
+        lines.append(f"total: {sum(g['count'] for g in replies)} replies, "
+                     f"{sum(g['tokens_in'] + g['tokens_out'] for g in replies)} tokens, "
+                     f"${sum(g['cost'] for g in replies):.4f}")
+        return "\n".join(lines)
+
+    def write_summary(self):
+        text = self.format_summary()
+        with open(self.summary_path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        return self.summary_path
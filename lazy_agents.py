@@ -0,0 +1,77 @@
+#lazy_agents.py
+import functools
+import time
+
+# Seconds spent building each agent's OpenAI client on first use (cold-start accounting).
+CLIENT_BUILD_SECONDS = {}
+
+
+@functools.lru_cache(maxsize=None)
+def tool_schema(func, name, description):
+    """Function-calling schema of a tool, computed once per (function, name, description) for all agents."""
+    from autogen.function_utils import get_function_schema
+
+    return get_function_schema(func, name=name, description=description)
+
+
+class LazyLLMClient:
+    """
+    Stand-in for an agent's OpenAIWrapper. The real client (HTTP pool, TLS context)
+    is built from agent.llm_config the first time the agent actually calls the model,
+    so agents the manager never selects cost nothing beyond their Python object.
+    """
+
+    def __init__(self, agent):
+        self._agent = agent
+        self._client = None
+
+    @property
+    def built(self):
+        return self._client is not None
+
+    def _get(self):
+        if self._client is None:
+            from autogen import OpenAIWrapper
+
+            start = time.perf_counter()
+            self._client = OpenAIWrapper(**self._agent.llm_config)
+            CLIENT_BUILD_SECONDS[self._agent.name] = time.perf_counter() - start
+        return self._client
+
+    # Usage is read before every reply (instrumentation); do not build the client for that.
+    @property
+    def actual_usage_summary(self):
+        return self._client.actual_usage_summary if self._client else None
+
+    @property
+    def total_usage_summary(self):
+        return self._client.total_usage_summary if self._client else None
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+
+def deferred(agent, llm_config):
+    """
+    Attach llm_config to an agent constructed with llm_config=False, with a client
+    that is only built when the agent is first selected to talk to the model.
+    """
+    agent.llm_config = dict(llm_config)
+    agent.client = LazyLLMClient(agent)
+    return agent
+
+
+def register_llm_tool(agent, name, description):
+    """
+    Same as agent.register_for_llm(name=..., description=...)(func), but with the
+    cached schema and without rebuilding the agent's OpenAI client for every tool.
+    """
+
+    def decorator(func):
+        tools = [t for t in agent.llm_config.get("tools", []) if t["function"]["name"] != name]
+        agent.llm_config["tools"] = tools + [tool_schema(func, name, description)]
+        if not isinstance(agent.client, LazyLLMClient) or agent.client.built:
+            agent.client = LazyLLMClient(agent)
+        return func
+
+    return decorator
@@ -0,0 +1,174 @@
+#llm_cache.py
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+CACHE_PATH = ".cache/llm_responses.db"
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    agent TEXT,
+    model TEXT,
+    system_hash TEXT,
+    history_hash TEXT,
+    value BLOB,
+    size INTEGER,
+    created REAL,
+    last_access REAL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access);
+CREATE INDEX IF NOT EXISTS idx_responses_agent ON responses(agent);
+CREATE TABLE IF NOT EXISTS stats (
+    agent TEXT PRIMARY KEY,
+    hits INTEGER DEFAULT 0,
+    misses INTEGER DEFAULT 0
+);
+"""
+
+
+def _sha(obj):
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def split_key(agent_name, key):
+    """
+    Build our cache key from the OpenAIWrapper key (the JSON of the create params):
+    agent name + model + hash of system messages + hash of the rest of the history.
+    """
+    try:
+        params = json.loads(key)
+        messages = params.get("messages") or []
+        model = str(params.get("model", ""))
+        system = [m for m in messages if isinstance(m, dict) and m.get("role") == "system"]
+        history = [m for m in messages if not (isinstance(m, dict) and m.get("role") == "system")]
+        rest = {k: v for k, v in params.items() if k != "messages"}
+        system_hash, history_hash = _sha(system), _sha([history, rest])
+    except (TypeError, ValueError):
+        model, system_hash, history_hash = "", "", hashlib.sha256(str(key).encode()).hexdigest()
+    full = hashlib.sha256(f"{agent_name}\0{model}\0{system_hash}\0{history_hash}".encode()).hexdigest()
+    return full, model, system_hash, history_hash
+
+
+class LLMResponseCache:
+    """
+    Persistent SQLite cache of model completions shared across runs, with
+    size-bounded LRU eviction and per-agent hit/miss counters.
+    Use attach_llm_cache() to give every agent its own namespaced view.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_CACHE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _count(self, agent, column):
+        self._conn.execute(f"INSERT INTO stats (agent, {column}) VALUES (?, 1) "
+                           f"ON CONFLICT(agent) DO UPDATE SET {column} = {column} + 1", (agent,))
+
+    def get(self, agent, key, default=None):
+        full = split_key(agent, key)[0]
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value FROM responses WHERE key = ?", (full,)).fetchone()
+            if row is None:
+                self._count(agent, "misses")
+                return default
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), full))
+            self._count(agent, "hits")
+        try:
+            return pickle.loads(row[0])
+        except Exception:
+            return default
+
+    def set(self, agent, key, value):
+        try:
+            blob = pickle.dumps(value)
+        except Exception:
+            return
+        full, model, system_hash, history_hash = split_key(agent, key)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (full, agent, model, system_hash, history_hash, blob, len(blob), now, now))
+            self._evict()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT agent, hits, misses FROM stats ORDER BY agent").fetchall()
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {
+            "entries": entries,
+            "bytes": size,
+            "agents": {agent: {"hits": hits, "misses": misses} for agent, hits, misses in rows},
+        }
+
+    def format_stats(self):
+        s = self.stats()
+        lines = [f"[+] LLM cache: {s['entries']} entries, {s['bytes'] / 1024:.1f} KiB"]
+        for agent, c in s["agents"].items():
+            total = c["hits"] + c["misses"]
+            rate = 100.0 * c["hits"] / total if total else 0.0
+            lines.append(f"    {agent}: {c['hits']} hit(s) / {c['misses']} miss(es) ({rate:.0f}% hit rate)")
+        return "\n".join(lines)
+
+    def clear(self, agent=None):
+        with self._lock, self._conn:
+            if agent:
+                self._conn.execute("DELETE FROM responses WHERE agent = ?", (agent,))
+            else:
+                self._conn.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class AgentCacheView:
+    """AbstractCache-compatible view of LLMResponseCache bound to one agent name."""
+
+    def __init__(self, cache, agent_name):
+        self.cache = cache
+        self.agent_name = agent_name
+
+    def get(self, key, default=None):
+        return self.cache.get(self.agent_name, key, default)
+
+    def set(self, key, value):
+        self.cache.set(self.agent_name, key, value)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def attach_llm_cache(agents, cache):
+    """Point each LLM-backed agent's client_cache at its own view of `cache`."""
+    for agent in agents:
+        if getattr(agent, "llm_config", False):
+            agent.client_cache = AgentCacheView(cache, agent.name)
@@ -1,11 +1,23 @@
+import argparse
 import os
-import socket
-from urllib.parse import urlparse, parse_qs
 from autogen.agentchat import AssistantAgent, ConversableAgent, UserProxyAgent, GroupChat, GroupChatManager
-from autogen.coding.local_commandline_code_executor import LocalCommandLineCodeExecutor
+from checkpoint import Checkpoint, with_checkpoint
+from code_executors import create_code_executor, register_job_tools
+from command_validator import attach_local_validator
+from dir_prober import probe_directories
+from port_prescan import tcp_prescan
 from reading_function import read_file
+from findings import read_findings
+from findings_db import query_findings
+from history_compaction import attach_history_compaction
+from instrumentation import Instrumentation
+from lazy_agents import deferred, register_llm_tool
+from llm_cache import LLMResponseCache, attach_llm_cache
 from report_save import save_report
-from web_form_analyzer import analyze_and_capture_url
+from result_cache import ResultCache, with_result_cache
+from recon_scheduler import run_scan_batch
+from speaker_selection import WorkflowSpeakerSelector
+from web_form_analyzer import analyze_and_capture_url, analyze_and_capture_urls
 
 #CONFIG
 config_list = [
@@ -25,6 +37,16 @@ llm_config = {
 }
 #interract
 interaction_mode="ALWAYS"
+#executor: "blocking" waits for each command, "background" returns a job id and streams output
+executor_mode="blocking"
+#persistent LLM response cache shared across runs (.cache/llm_responses.db)
+use_llm_cache=True
+#checkpoint after every executed step (pentest_results/checkpoints/pentest.json); continue with --resume
+use_checkpoints=True
+#reuse scan artifacts for identical command + target fingerprint + tool version (.cache/results); --refresh drops them
+use_result_cache=True
+#per-run timing/token/cost report (pentest_results/reports/perf_<run>.jsonl + .txt)
+use_instrumentation=True
 
 def ensure_directories():
     directories = [
@@ -39,26 +61,20 @@ def ensure_directories():
         print(f"[+] Created: {directory}")
 
 
-def get_ip_from_url(url):
-    try:
-        hostname = url.replace("http://", "").replace("https://", "").split("/")[0]
-        ip_address = socket.gethostbyname(hostname)
-        return ip_address
-    except Exception as e:
-        return f"Error resolving IP: {str(e)}"
 
 
-
-def pentest_team(llm_config, interaction_mode="NEVER"):
-    nmap_agent = ConversableAgent(
+def pentest_team(llm_config, interaction_mode="NEVER", executor_mode="blocking", checkpoint=None, result_cache=None):
+    nmap_agent = deferred(ConversableAgent(
         name="Nmap-Agent",
         system_message="""
             You're a cybersecurity professional specialized in reconnaissance using Nmap.
-            You are responsible for discovering open ports and running services using `nmap`. Use flags appropriate for a full scan.
+            You are responsible for discovering open ports and running services using `nmap`.
+            First call the `tcp_prescan` tool with the target: it sweeps all TCP ports in seconds.
+            Then run service detection (`nmap -sV -p <open ports>`) only on the open ports it returns; never run -sV over the full port range.
             You must redirect output to a file located at: `pentest_results/recon/nmap_scan.txt`.
             After that must call Code-Checker
             When generating a command:
-            - Use only nmap
+            - Use only nmap (after tcp_prescan)
             - Always redirect output
             - Do not attempt to use other tools or write logic, only one command at a time
             - Format your command inside a bash code block like:
@@ -66,11 +82,11 @@ def pentest_team(llm_config, interaction_mode="NEVER"):
             <your_command_here>
         ```
         """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode,
-    )
+    ), llm_config)
 
-    whatweb_agent = ConversableAgent(
+    whatweb_agent = deferred(ConversableAgent(
         name="WhatWeb-Agent",
         system_message="""
             You are responsible for identifying web technologies using WhatWeb.
@@ -83,11 +99,11 @@ def pentest_team(llm_config, interaction_mode="NEVER"):
             <your_command>
             ```
         """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode,
-    )
+    ), llm_config)
 
-    directory_scanner = ConversableAgent(
+    directory_scanner = deferred(ConversableAgent(
         name="Directory-Scanner",
         system_message="""
             You're responsible for discovering web directories using Gobuster.
@@ -96,7 +112,8 @@ def pentest_team(llm_config, interaction_mode="NEVER"):
             After that must call Code-Checker
             Using cookie (if have) to bypass authetication of the web
             Guidelines:
-            - Only use Gobuster
+            - Only use Gobuster, except for short wordlists (such as url_dvwa.txt, up to a few hundred entries):
+              call the `probe_directories` tool instead; it writes the same gobuster_scan.txt in well under a second.
             - The wordlist is **not fixed** — you may use `/home/kali/Desktop/AI_4/url_dvwa.txt`, `/usr/share/wordlists/dirb/common.txt`, `/usr/share/wordlists/dirbuster/directory-list-2.3-medium.txt`, or any appropriate wordlist based on the target.
             - Always redirect to file
             - Respond with one properly formatted command:
@@ -104,11 +121,11 @@ def pentest_team(llm_config, interaction_mode="NEVER"):
             <your_command> 
             ```
         """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode,
-    )
+    ), llm_config)
 
-    crawler_agent = ConversableAgent(
+    crawler_agent = deferred(ConversableAgent(
         name="Endpoint-Crawler",
         system_message="""
             You're in charge of crawling endpoints using Hakrawler.
@@ -123,11 +140,11 @@ def pentest_team(llm_config, interaction_mode="NEVER"):
             <command>
             ```
         """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode,
-    )
+    ), llm_config)
 
-    checker = ConversableAgent(
+    checker = deferred(ConversableAgent(
         name="Code-Checker",
         system_message="""
             You're a professional code checker, whose job is whenever a command or code is created before its run you should first, checking if the code is correct. if there is a typing mistake, an argument mistake, a language mistake, etc you should say something so that the code is rewritten by the agent who produced this code. Also check if the command was generated in the right format, with the specified language. The format should be:
@@ -142,16 +159,21 @@ def pentest_team(llm_config, interaction_mode="NEVER"):
             - If they send full command, validate syntax, flags, and output redirection .
             - Do not give the user like this 'Make sure that the directory exists before running this command to avoid any errors' (That is your job)
             - Finally give it for Code-Executor
+            - For recon scans (Nmap, WhatWeb, Gobuster, Hakrawler): once every scanner's command is validated, call the `run_scan_batch` tool ONCE
+              with all of them, e.g. [{"name": "nmap", "command": "<cmd>", "depends_on": []}, ...].
+              Only fill `depends_on` when a command needs another command's output file; independent scans run in parallel.
             Always reply with this exact format:
             ```bash
             <correct bash command>
             ```
         """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode,
-    )
+    ), llm_config)
+    attach_local_validator(checker)
 
-    executor = LocalCommandLineCodeExecutor(timeout=3600, work_dir=".")
+    executor = create_code_executor(executor_mode, timeout=3600, work_dir=".")
+    executor = with_checkpoint(with_result_cache(executor, result_cache), checkpoint)
     code_executor = AssistantAgent(
         name="Code-Executor",
         llm_config=False,
@@ -159,27 +181,41 @@ def pentest_team(llm_config, interaction_mode="NEVER"):
         human_input_mode=interaction_mode,
     )
 
-    file_reader = AssistantAgent(
+    file_reader = deferred(AssistantAgent(
         name="File-Reader",
-        system_message="Read and summarize result files.",
-        llm_config=llm_config,
+        system_message="Read and summarize result files. Prefer read_findings for nmap/gobuster/whatweb/nuclei results; use read_file for anything else.",
+        llm_config=False,
         human_input_mode=interaction_mode,
-    )
-    file_reader.register_for_llm(name="read_file", description="Read a scan result file")(read_file)
-    file_reader.register_for_execution(name="read_file", description="Read a scan result file")(read_file)
-
-    user_proxy = UserProxyAgent(
+    ), llm_config)
+    register_llm_tool(file_reader, name="read_file", description="Read a scan result file (paged: offset/limit bytes, start_line/end_line, tail lines, regex pattern)")(read_file)
+    file_reader.register_for_execution(name="read_file", description="Read a scan result file (paged: offset/limit bytes, start_line/end_line, tail lines, regex pattern)")(read_file)
+    register_llm_tool(file_reader, name="read_findings", description="Query parsed scan records (ports, paths, technologies, nuclei hits) instead of raw files")(read_findings)
+    file_reader.register_for_execution(name="read_findings")(read_findings)
+    register_llm_tool(file_reader, name="query_findings", description="Indexed query over all findings by target, tool, severity, URL or kind")(query_findings)
+    file_reader.register_for_execution(name="query_findings")(query_findings)
+
+    user_proxy = deferred(UserProxyAgent(
         name="User-Proxy",
         system_message="A human security analyst overseeing the pentest operation. You must confirm commands after validation by Code-Checker before they are executed.",
         is_termination_msg=lambda msg: "TERMINATE" in msg["content"],
         code_execution_config={"work_dir": ".", "use_docker": False},
         human_input_mode=interaction_mode,
-        llm_config=llm_config
-    )
+        llm_config=False
+    ), llm_config)
+    if executor_mode == "background":
+        register_job_tools(file_reader, user_proxy)
     user_proxy.register_for_execution(name="read_file")(read_file)
+    user_proxy.register_for_execution(name="read_findings")(read_findings)
+    user_proxy.register_for_execution(name="query_findings")(query_findings)
+    register_llm_tool(checker, name="run_scan_batch", description="Run validated recon commands in parallel as a dependency graph")(run_scan_batch)
+    user_proxy.register_for_execution(name="run_scan_batch")(run_scan_batch)
+    register_llm_tool(nmap_agent, name="tcp_prescan", description="Fast TCP connect sweep of all ports; returns the open ports to give nmap -sV")(tcp_prescan)
+    user_proxy.register_for_execution(name="tcp_prescan")(tcp_prescan)
+    register_llm_tool(directory_scanner, name="probe_directories", description="In-process directory brute force for short wordlists (gobuster output format, header.txt cookie)")(probe_directories)
+    user_proxy.register_for_execution(name="probe_directories")(probe_directories)
 
 
-    report_writer = AssistantAgent(
+    report_writer = deferred(AssistantAgent(
         name="Report-Writer",
         system_message="""
             You're a professional security report writer.
@@ -188,38 +224,42 @@ def pentest_team(llm_config, interaction_mode="NEVER"):
 
             After writing the report, you MUST call the `save_report` tool to save the file. Do not skip this step.
         """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode
-    )
-    report_writer.register_for_llm(name="save_report", description="Save the final recon report")(save_report)
+    ), llm_config)
+    register_llm_tool(report_writer, name="save_report", description="Save the final recon report")(save_report)
     report_writer.register_for_execution(name="save_report")(save_report)
+    register_llm_tool(report_writer, name="query_findings", description="Indexed query over all findings by target, tool, severity, URL or kind")(query_findings)
+    report_writer.register_for_execution(name="query_findings")(query_findings)
     user_proxy.register_for_execution(name="save_report")(save_report)
 
 
 
-    recon_summarizer = ConversableAgent(
+    recon_summarizer = deferred(ConversableAgent(
         name="Recon-Summarizer",
         system_message="Analyze recon results, highlight key findings. ",
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode,
-    )
+    ), llm_config)
 
 
     # VULN_TEAM
     # === Parameter-URL Extractor Agent ===
-    param_agent = ConversableAgent(
+    param_agent = deferred(ConversableAgent(
         name="Param-URL-Extractor",
         system_message="""
         You're a parameterized-URL extractor. You take a base URL, auto-login and auto-submit forms,
         then return the final URL (which may include parameters). Use the analyze_form_and_capture_url tool.
+        When you have several URLs (or a wordlist / gobuster result file), call analyze_forms_and_capture_urls once instead of one call per URL.
         You should choose 10 url that can be vulnerability
 
         """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode
-    )
+    ), llm_config)
     # register the tool both for LLm planning and execution
-    param_agent.register_for_llm(
+    register_llm_tool(
+        param_agent,
         name="analyze_form_and_capture_url",
         description="Analyze a webpage form and capture resulting URL."
     )(analyze_and_capture_url)
@@ -227,9 +267,18 @@ def pentest_team(llm_config, interaction_mode="NEVER"):
         name="analyze_form_and_capture_url",
         description="Analyze a webpage form and capture resulting URL."
     )(analyze_and_capture_url)
+    register_llm_tool(
+        param_agent,
+        name="analyze_forms_and_capture_urls",
+        description="Analyze many webpages concurrently (URLs, paths + base_url, or a wordlist/gobuster file) and capture resulting URLs."
+    )(analyze_and_capture_urls)
+    param_agent.register_for_execution(
+        name="analyze_forms_and_capture_urls",
+        description="Analyze many webpages concurrently (URLs, paths + base_url, or a wordlist/gobuster file) and capture resulting URLs."
+    )(analyze_and_capture_urls)
 
     # === Nuclei Agent ===
-    nuclei_agent = ConversableAgent(
+    nuclei_agent = deferred(ConversableAgent(
         name="Nuclei-Scanner",
         system_message="""
         You're a vulnerability scanning agent using Nuclei.
@@ -248,12 +297,12 @@ def pentest_team(llm_config, interaction_mode="NEVER"):
         ```
 
         """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode
-    )
+    ), llm_config)
 
     # === Exploit Generator ===
-    exploit_agent = ConversableAgent(
+    exploit_agent = deferred(ConversableAgent(
         name="Exploit-Agent",
         system_message="""
     You're an exploit agent. You will be provided with a vulnerability summary report (SQLi, LFI, etc.).
@@ -262,15 +311,24 @@ def pentest_team(llm_config, interaction_mode="NEVER"):
     - LFI: use curl or wget to read sensitive files (e.g., /etc/passwd).
     Return each command in its own bash block, redirect output to pentest_results/exploit/exploit_<type>_<name>.txt
     """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode,
-    )
+    ), llm_config)
 
     pentest_team = GroupChat(
         agents=[user_proxy, nmap_agent, whatweb_agent, directory_scanner, param_agent,nuclei_agent,exploit_agent,file_reader,checker, code_executor, report_writer],
         messages=[],
-        max_round=50
+        max_round=50,
+        speaker_selection_method=WorkflowSpeakerSelector(
+            steps=[file_reader, nmap_agent, whatweb_agent, directory_scanner, report_writer,
+                   param_agent, nuclei_agent, report_writer, exploit_agent, report_writer],
+            checker=checker, approver=user_proxy, executor=code_executor, reader=file_reader,
+            batched=[nmap_agent, whatweb_agent, directory_scanner],
+        ),
     )
+    attach_history_compaction(pentest_team.agents)
+    if checkpoint is not None:
+        checkpoint.track(pentest_team)
     manager = GroupChatManager(
         name="Recon-Manager",
         groupchat=pentest_team,
@@ -282,10 +340,11 @@ def pentest_team(llm_config, interaction_mode="NEVER"):
         Follow these exact steps:
         0. Use File-Reader to load header.txt.
         1. Ask for target (e.g., IP or URL).
-        2. For each tool below, generate command -> validate with Code-Checker -> approve -> execute -> read result:
+        2. For each tool below, generate command -> validate with Code-Checker:
             - Nmap-Agent
             - WhatWeb-Agent
             - Directory-Scanner
+           Then Code-Checker calls `run_scan_batch` once with all validated commands -> User-Proxy approves and runs it (scans run in parallel) -> read results.
         3 Save report `recon`
         3. Run nuclei to scan the vulnerable and save report `vuln_scan`
         4. Exploit the vulnerable and save report `exploit`
@@ -299,14 +358,44 @@ def pentest_team(llm_config, interaction_mode="NEVER"):
         "team": pentest_team
     }
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-agent pentest workflow")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from the last checkpoint; finished commands with unchanged outputs are skipped")
+    parser.add_argument("--refresh", nargs="?", const="", default=None, metavar="TARGET",
+                        help="invalidate cached scan results (all, or only those for TARGET) before running")
+    args = parser.parse_args()
     ensure_directories()
     print("=== PENTESTING WORKFLOW ===")
     print("1. Reconnaissance")
     print("2. Vulnerability Scanning")
     print("3. Exploitation")
     
-    pentest = pentest_team(llm_config, interaction_mode="ALWAYS")
-    pentest["user_proxy"].initiate_chat(
-        pentest["manager"],
-        message="Please start by reading /home/kali/Desktop/AI_3/header.txt using File-Reader to retrieve the cookie. After that, ask for the Target URL or IP. The URL is : localhost:8085"
-    )
+    checkpoint = Checkpoint("pentest", resume=args.resume).activate() if use_checkpoints or args.resume else None
+    result_cache = ResultCache().activate() if use_result_cache else None
+    if result_cache and args.refresh is not None:
+        print(f"[+] Dropped {result_cache.invalidate(target=args.refresh)} cached scan result(s)")
+    pentest = pentest_team(llm_config, interaction_mode="ALWAYS", executor_mode=executor_mode,
+                           checkpoint=checkpoint, result_cache=result_cache)
+    llm_cache = LLMResponseCache() if use_llm_cache else None
+    if llm_cache:
+        attach_llm_cache(pentest["team"].agents, llm_cache)
+    instrumentation = Instrumentation(config_list).attach(pentest["team"].agents) if use_instrumentation else None
+    if args.resume and checkpoint.messages:
+        print(f"[+] Resuming from {checkpoint.path} ({len(checkpoint.messages)} messages, {len(checkpoint.commands)} commands)")
+        pentest["team"].speaker_selection_method.replay(pentest["team"], checkpoint.messages)
+        last_agent, last_message = pentest["manager"].resume(checkpoint.messages)
+        last_agent.initiate_chat(pentest["manager"], message=last_message, clear_history=False)
+    else:
+        pentest["user_proxy"].initiate_chat(
+            pentest["manager"],
+            message="Please start by reading /home/kali/Desktop/AI_3/header.txt using File-Reader to retrieve the cookie. After that, ask for the Target URL or IP. The URL is : localhost:8085"
+        )
+    if checkpoint:
+        checkpoint.save()
+    if result_cache:
+        print(f"[+] Scan result cache: {result_cache.hits} hit(s), {result_cache.misses} miss(es)")
+    if instrumentation:
+        print(instrumentation.format_summary())
+        print(f"[+] Performance report: {instrumentation.write_summary()}")
+    if llm_cache:
+        print(llm_cache.format_stats())
@@ -0,0 +1,156 @@
+#port_prescan.py
+import asyncio
+import errno
+import ipaddress
+import os
+import resource
+import socket
+import time
+
+from resolver import host_of, resolver
+
+ALL_PORTS = "1-65535"
+PRESCAN_CONCURRENCY = 2000     # sockets in flight (also capped by the open-file limit)
+CONNECT_TIMEOUT = 0.5          # seconds per connect attempt; raise it for remote/slow targets
+RETRIES = 1                    # extra attempts for ports that timed out (dropped SYNs under load)
+PRESCAN_FILE = "pentest_results/recon/prescan_ports.txt"
+NMAP_OUTPUT = "pentest_results/recon/nmap_scan.txt"
+
+
+def parse_ports(spec: str) -> list:
+    """'1-1024,8080,8085' -> sorted unique port list."""
+    ports = set()
+    for part in (spec or ALL_PORTS).replace(" ", "").split(","):
+        if not part:
+            continue
+        low, _, high = part.partition("-")
+        low, high = int(low), int(high or low)
+        ports.update(p for p in range(low, high + 1) if 0 < p < 65536)
+    return sorted(ports)
+
+
+def _concurrency_limit(requested):
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    return max(1, min(requested, soft - 64 if soft > 128 else soft // 2))
+
+
+def _set_ready(future):
+    if not future.done():
+        future.set_result(None)
+
+
+async def _connect(loop, ip, family, port, timeout):
+    """'open', 'closed' (refused/unreachable) or 'timeout'."""
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    try:
+        # Refusals (RST) come back straight from connect_ex; only pending handshakes go through the loop.
+        err = sock.connect_ex((ip, port))
+        if err in (errno.EINPROGRESS, errno.EAGAIN, errno.EWOULDBLOCK):
+            writable = loop.create_future()
+            loop.add_writer(sock.fileno(), _set_ready, writable)
+            try:
+                await asyncio.wait_for(writable, timeout)
+            except asyncio.TimeoutError:
+                return "timeout"
+            finally:
+                loop.remove_writer(sock.fileno())
+            err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        return "open" if err == 0 else "closed"
+    except OSError:
+        return "closed"
+    finally:
+        sock.close()
+
+
+async def _sweep(ip, ports, timeout, workers):
+    """States of `ports`, probed by a fixed pool of workers (cheaper than one task per port)."""
+    loop = asyncio.get_running_loop()
+    family = socket.AF_INET6 if ":" in ip else socket.AF_INET
+    queue = iter(ports)
+    states = {}
+
+    async def worker():
+        for port in queue:
+            states[port] = await _connect(loop, ip, family, port, timeout)
+
+    await asyncio.gather(*(worker() for _ in range(min(workers, len(ports)) or 1)))
+    return states
+
+
+async def scan_ports(ip, ports, timeout=CONNECT_TIMEOUT, concurrency=PRESCAN_CONCURRENCY, retries=RETRIES):
+    """TCP connect sweep of `ports` on `ip`; returns (open_ports, timed_out_ports)."""
+    workers = _concurrency_limit(concurrency)
+    pending, found = list(ports), []
+    for attempt in range(retries + 1):
+        states = await _sweep(ip, pending, timeout, workers)
+        found += [p for p in pending if states[p] == "open"]
+        pending = [p for p in pending if states[p] == "timeout"]
+        if not pending:
+            break
+    return sorted(found), pending
+
+
+def resolve_target(target):
+    """(hostname, ip) of a host, host:port or URL target; ValueError if it does not resolve."""
+    return host_of(target), resolver.resolve(target)[0]
+
+
+def nmap_family_flag(ip):
+    """'-6 ' for an IPv6 address (nmap refuses IPv6 targets without it), else ''."""
+    try:
+        return "-6 " if ipaddress.ip_address(ip).version == 6 else ""
+    except ValueError:
+        return ""
+
+
+def nmap_service_command(ip, open_ports, output=NMAP_OUTPUT):
+    return f"nmap {nmap_family_flag(ip)}-sV -Pn -p {','.join(map(str, open_ports))} {ip} -oN {output}"
+
+
+def prescan_open_ports(target, ports=ALL_PORTS, timeout=CONNECT_TIMEOUT, concurrency=PRESCAN_CONCURRENCY):
+    """Open ports of a target (host, host:port or URL) plus the sweep's summary dict."""
+    host, ip = resolve_target(target)
+    port_list = parse_ports(ports)
+    start = time.perf_counter()
+    open_ports, timed_out = asyncio.run(scan_ports(ip, port_list, timeout, concurrency))
+    return open_ports, {
+        "host": host,
+        "ip": ip,
+        "scanned": len(port_list),
+        "open": open_ports,
+        "no_answer": len(timed_out),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def tcp_prescan(target: str, ports: str = ALL_PORTS, timeout: float = CONNECT_TIMEOUT,
+                concurrency: int = PRESCAN_CONCURRENCY) -> str:
+    """
+    Fast TCP connect sweep (all ports by default) before Nmap.
+    Returns the open ports and the `nmap -sV` command limited to them; the list is also saved to
+    pentest_results/recon/prescan_ports.txt.
+    """
+    try:
+        open_ports, summary = prescan_open_ports(target, ports, timeout, concurrency)
+    except ValueError as e:
+        return str(e)
+    os.makedirs(os.path.dirname(PRESCAN_FILE), exist_ok=True)
+    with open(PRESCAN_FILE, "w", encoding="utf-8") as f:
+        f.write(f"# {summary['host']} ({summary['ip']}) {summary['scanned']} ports in {summary['seconds']}s\n")
+        f.write("".join(f"{p}/tcp open\n" for p in open_ports))
+    lines = [f"Pre-scan of {summary['host']} ({summary['ip']}): {summary['scanned']} ports in {summary['seconds']}s"]
+    if not open_ports:
+        lines.append("No open TCP ports found (host down, filtered, or timeout too short).")
+        return "\n".join(lines)
+    lines.append("Open ports: " + ",".join(map(str, open_ports)))
+    if summary["no_answer"]:
+        lines.append(f"{summary['no_answer']} port(s) never answered (filtered?).")
+    lines.append("Run service detection only on these ports:")
+    lines.append(f"```bash\n{nmap_service_command(summary['ip'], open_ports)}\n```")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import sys
+    print(tcp_prescan(sys.argv[1] if len(sys.argv) > 1 else "localhost", *sys.argv[2:3]))
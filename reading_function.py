@@ -1,17 +1,107 @@
 import os
+import re
+from collections import deque
 
-def read_file(file_name: str, base_dir: str = "pentest_results/recon") -> str:
+MAX_READ_BYTES = 20000   # default cap on what one read_file call returns (~5k tokens)
+_BLOCK = 64 * 1024
+
+
+def _resolve(file_name, base_dir):
     # Nếu file_name đã là absolute path hoặc đã chứa base_dir thì giữ nguyên
     if os.path.isabs(file_name) or file_name.startswith(base_dir):
-        file_path = file_name
-    else:
-        file_path = os.path.join(base_dir, file_name)
+        return file_name
+    return os.path.join(base_dir, file_name)
+
+
+def _tail_lines(f, size, count):
+    """Return the last `count` lines, reading backwards in blocks."""
+    data, pos = b"", size
+    while pos > 0 and data.count(b"\n") <= count:
+        step = min(_BLOCK, pos)
+        pos -= step
+        f.seek(pos)
+        data = f.read(step) + data
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    return lines[-count:]
+
+
+def read_file(file_name: str, base_dir: str = "pentest_results/recon", offset: int = 0, limit: int = MAX_READ_BYTES,
+              start_line: int = 0, end_line: int = 0, tail: int = 0, pattern: str = "") -> str:
+    """
+    Read a result file without flooding the context.
+    - offset/limit: byte window (default: first MAX_READ_BYTES bytes).
+    - start_line/end_line: 1-based inclusive line range.
+    - tail: last N lines.
+    - pattern: regex; only matching lines are returned, prefixed with their line number.
+    Partial results start with a header giving the file size and how to fetch the next page.
+    """
+    file_path = _resolve(file_name, base_dir)
 
     if not os.path.exists(file_path):
         return f"File not found: {os.path.abspath(file_path)}"
 
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return f.read()
+        size = os.path.getsize(file_path)
+        limit = max(1, limit)
+        regex = re.compile(pattern) if pattern else None
+        with open(file_path, "rb") as f:
+            if tail > 0 and regex is None and start_line <= 0 and end_line <= 0:
+                lines = _tail_lines(f, size, tail)
+                body = "\n".join(lines)[-limit:]
+                return f"[{file_path}: {size} bytes, last {len(lines)} line(s)]\n{body}"
+
+            if regex is not None or start_line > 0 or end_line > 0:
+                # With tail, keep the last N selected lines first and apply the byte budget afterwards.
+                out = deque(maxlen=tail) if tail > 0 else []
+                used, matched, truncated, next_line, last_no = 0, 0, False, 0, 0
+                for no, raw in enumerate(f, 1):
+                    last_no = no
+                    if start_line and no < start_line:
+                        continue
+                    if end_line and no > end_line:
+                        break
+                    line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                    if regex is not None:
+                        if not regex.search(line):
+                            continue
+                        line = f"{no}: {line}"
+                    matched += 1
+                    if tail > 0:
+                        out.append(line)
+                        continue
+                    if used + len(line) + 1 > limit:
+                        if not truncated:
+                            truncated, next_line = True, no
+                        continue
+                    out.append(line)
+                    used += len(line) + 1
+                if tail > 0:
+                    kept = []
+                    for line in reversed(out):
+                        if used + len(line) + 1 > limit:
+                            truncated = True
+                            break
+                        kept.append(line)
+                        used += len(line) + 1
+                    out = kept[::-1]
+                what = f"{matched} matching line(s)" if regex is not None else f"lines {start_line or 1}-{end_line or last_no}"
+                if tail > 0:
+                    what += f", last {len(out)} shown"
+                note = f", output truncated at {limit} bytes" if truncated else ""
+                if next_line:
+                    note += f", next page: start_line={next_line}"
+                return f"[{file_path}: {size} bytes, {what}{note}]\n" + "\n".join(out)
+
+            offset = min(max(0, offset), size)
+            f.seek(offset)
+            chunk = f.read(limit)
+            text = chunk.decode("utf-8", errors="replace")
+            end = offset + len(chunk)
+            if offset == 0 and end >= size:
+                return text
+            more = f", next page: offset={end}" if end < size else ""
+            return f"[{file_path}: {size} bytes, showing bytes {offset}-{end}{more}]\n{text}"
+    except re.error as e:
+        return f"Invalid pattern {pattern!r}: {e}"
     except Exception as e:
         return f"Error reading file {file_path}: {e}"
@@ -0,0 +1,159 @@
+#recon_scheduler.py
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, List
+
+from checkpoint import current_checkpoint
+from governor import governor
+from response_clusters import collapse_scan_output
+from result_cache import current_result_cache
+
+MAX_WORKERS = 4
+COMMAND_TIMEOUT = 3600
+OUTPUT_TAIL_LINES = 20
+
+
+class ScanJob:
+    __slots__ = ("name", "command", "depends_on", "status", "exit_code", "output", "started", "finished")
+
+    def __init__(self, name, command, depends_on=()):
+        self.name = name
+        self.command = command
+        self.depends_on = list(depends_on)
+        self.status = "pending"
+        self.exit_code = None
+        self.output = ""
+        self.started = None
+        self.finished = None
+
+    @property
+    def seconds(self):
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+
+def _run_job(job, timeout, work_dir):
+    job.started = time.monotonic()
+    checkpoint = current_checkpoint()
+    if checkpoint is not None and checkpoint.is_done(job.command):
+        job.exit_code, job.output = 0, "[resume] skipped, already finished with unchanged outputs"
+        job.finished, job.status = time.monotonic(), "done"
+        return job
+    cache = current_result_cache()
+    cached = cache.lookup(job.command) if cache is not None else None
+    if cached is not None:
+        job.exit_code, job.output = 0, cached
+        job.finished, job.status = time.monotonic(), "done"
+        if checkpoint is not None:
+            checkpoint.record(job.command, job.exit_code)
+        return job
+    try:
+        with governor.admit(job.command) as command:
+            proc = subprocess.run(
+                command, shell=True, cwd=work_dir, timeout=timeout,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace",
+            )
+        job.exit_code = proc.returncode
+        job.output = proc.stdout
+    except subprocess.TimeoutExpired as e:
+        job.exit_code = 124
+        output = e.stdout or ""
+        job.output = output.decode(errors="replace") if isinstance(output, bytes) else output
+        job.output += f"\n[!] Timed out after {timeout}s"
+    if job.exit_code == 0:
+        # Fold soft-404 / login-redirect clusters before agents, nuclei or the result cache see the file.
+        note = collapse_scan_output(job.command)
+        if note:
+            job.output += f"\n{note}"
+    job.finished = time.monotonic()
+    job.status = "done" if job.exit_code == 0 else "failed"
+    if cache is not None and job.exit_code == 0:
+        cache.store(job.command, job.output)
+    if checkpoint is not None:
+        checkpoint.record(job.command, job.exit_code)
+    return job
+
+
+def _check_graph(jobs):
+    names = {job.name for job in jobs}
+    if len(names) != len(jobs):
+        raise ValueError("Duplicate job names in scan graph")
+    for job in jobs:
+        missing = [dep for dep in job.depends_on if dep not in names]
+        if missing:
+            raise ValueError(f"Job '{job.name}' depends on unknown job(s): {', '.join(missing)}")
+    # Kahn's algorithm: anything left over is part of a cycle.
+    indegree = {job.name: len(job.depends_on) for job in jobs}
+    ready = [name for name, deg in indegree.items() if deg == 0]
+    seen = 0
+    while ready:
+        name = ready.pop()
+        seen += 1
+        for job in jobs:
+            if name in job.depends_on:
+                indegree[job.name] -= 1
+                if indegree[job.name] == 0:
+                    ready.append(job.name)
+    if seen != len(jobs):
+        raise ValueError("Scan graph contains a dependency cycle")
+
+
+def run_command_graph(jobs, max_workers=MAX_WORKERS, timeout=COMMAND_TIMEOUT, work_dir="."):
+    """
+    Run ScanJobs on a worker pool, starting each one as soon as all of its
+    dependencies have finished successfully. Jobs whose dependency failed are
+    marked "skipped". Returns the jobs in their original order.
+    """
+    _check_graph(jobs)
+    by_name = {job.name: job for job in jobs}
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            for job in jobs:
+                if job.status != "pending":
+                    continue
+                deps = [by_name[d] for d in job.depends_on]
+                if any(d.status in ("failed", "skipped") for d in deps):
+                    job.status = "skipped"
+                elif all(d.status == "done" for d in deps):
+                    job.status = "running"
+                    running[pool.submit(_run_job, job, timeout, work_dir)] = job
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                running.pop(future)
+                future.result()
+    return jobs
+
+
+def _format_results(jobs, wall):
+    lines = [f"Ran {len(jobs)} command(s) in {wall:.1f}s (sequential would be ~{sum(j.seconds for j in jobs):.1f}s)"]
+    for job in jobs:
+        lines.append("")
+        lines.append(f"### {job.name} [{job.status}] exit_code={job.exit_code} time={job.seconds:.1f}s")
+        lines.append(f"$ {job.command}")
+        tail = job.output.strip().splitlines()[-OUTPUT_TAIL_LINES:]
+        if tail:
+            lines.extend(tail)
+    return "\n".join(lines)
+
+
+def run_scan_batch(commands: List[Dict[str, Any]], max_workers: int = MAX_WORKERS) -> str:
+    """
+    Execute approved scan commands as a dependency graph.
+    Each item: {"name": "nmap", "command": "nmap ... -oN pentest_results/recon/nmap_scan.txt", "depends_on": []}.
+    Independent commands run in parallel; the tool returns once all of them finished.
+    """
+    try:
+        jobs = [
+            ScanJob(item.get("name") or f"job{i}", item["command"], item.get("depends_on") or ())
+            for i, item in enumerate(commands, 1)
+        ]
+        start = time.monotonic()
+        run_command_graph(jobs, max_workers=max_workers)
+        return _format_results(jobs, time.monotonic() - start)
+    except (KeyError, ValueError) as e:
+        return f"Error in scan batch: {e}"
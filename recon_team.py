@@ -1,33 +1,36 @@
 import os
-import socket
-from urllib.parse import urlparse, parse_qs
 from autogen.agentchat import AssistantAgent, ConversableAgent, UserProxyAgent, GroupChat, GroupChatManager
-from autogen.coding.local_commandline_code_executor import LocalCommandLineCodeExecutor
+from checkpoint import with_checkpoint
+from code_executors import create_code_executor, register_job_tools
+from command_validator import attach_local_validator
+from dir_prober import probe_directories
+from port_prescan import tcp_prescan
 from reading_function import read_file
+from findings import read_findings
+from findings_db import query_findings
+from history_compaction import attach_history_compaction
+from lazy_agents import deferred, register_llm_tool
 from report_save import save_report
+from result_cache import with_result_cache
+from recon_scheduler import run_scan_batch
+from speaker_selection import WorkflowSpeakerSelector
 
-def get_ip_from_url(url):
-    try:
-        hostname = url.replace("http://", "").replace("https://", "").split("/")[0]
-        ip_address = socket.gethostbyname(hostname)
-        return ip_address
-    except Exception as e:
-        return f"Error resolving IP: {str(e)}"
 
 
-
-def create_recon_team(llm_config, interaction_mode="NEVER"):
+def create_recon_team(llm_config, interaction_mode="NEVER", executor_mode="blocking", checkpoint=None, result_cache=None):
     os.makedirs("pentest_results/recon", exist_ok=True)
 
-    nmap_agent = ConversableAgent(
+    nmap_agent = deferred(ConversableAgent(
         name="Nmap-Agent",
         system_message="""
             You're a cybersecurity professional specialized in reconnaissance using Nmap.
-            You are responsible for discovering open ports and running services using `nmap`. Use flags appropriate for a full scan.
+            You are responsible for discovering open ports and running services using `nmap`.
+            First call the `tcp_prescan` tool with the target: it sweeps all TCP ports in seconds.
+            Then run service detection (`nmap -sV -p <open ports>`) only on the open ports it returns; never run -sV over the full port range.
             You must redirect output to a file located at: `pentest_results/recon/nmap_scan.txt`.
             After that must call Code-Checker
             When generating a command:
-            - Use only nmap
+            - Use only nmap (after tcp_prescan)
             - Always redirect output
             - Do not attempt to use other tools or write logic, only one command at a time
             - Format your command inside a bash code block like:
@@ -35,11 +38,11 @@ def create_recon_team(llm_config, interaction_mode="NEVER"):
             <your_command_here>
         ```
         """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode,
-    )
+    ), llm_config)
 
-    whatweb_agent = ConversableAgent(
+    whatweb_agent = deferred(ConversableAgent(
         name="WhatWeb-Agent",
         system_message="""
             You are responsible for identifying web technologies using WhatWeb.
@@ -52,11 +55,11 @@ def create_recon_team(llm_config, interaction_mode="NEVER"):
             <your_command>
             ```
         """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode,
-    )
+    ), llm_config)
 
-    directory_scanner = ConversableAgent(
+    directory_scanner = deferred(ConversableAgent(
         name="Directory-Scanner",
         system_message="""
             You're responsible for discovering web directories using Gobuster.
@@ -65,7 +68,8 @@ def create_recon_team(llm_config, interaction_mode="NEVER"):
             After that must call Code-Checker
             Using cookie (if have) to bypass authetication of the web
             Guidelines:
-            - Only use Gobuster
+            - Only use Gobuster, except for short wordlists (such as url_dvwa.txt, up to a few hundred entries):
+              call the `probe_directories` tool instead; it writes the same gobuster_scan.txt in well under a second.
             - The wordlist is **not fixed** — you may use `/home/kali/Desktop/AI_4/url_dvwa.txt`, `/usr/share/wordlists/dirb/common.txt`, `/usr/share/wordlists/dirbuster/directory-list-2.3-medium.txt`, or any appropriate wordlist based on the target.
             - Always redirect to file
             - Respond with one properly formatted command:
@@ -73,11 +77,11 @@ def create_recon_team(llm_config, interaction_mode="NEVER"):
             <your_command> 
             ```
         """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode,
-    )
+    ), llm_config)
 
-    crawler_agent = ConversableAgent(
+    crawler_agent = deferred(ConversableAgent(
         name="Endpoint-Crawler",
         system_message="""
             You're in charge of crawling endpoints using Hakrawler.
@@ -92,11 +96,11 @@ def create_recon_team(llm_config, interaction_mode="NEVER"):
             <command>
             ```
         """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode,
-    )
+    ), llm_config)
 
-    checker = ConversableAgent(
+    checker = deferred(ConversableAgent(
         name="Code-Checker",
         system_message="""
             You're a professional code checker, whose job is whenever a command or code is created before its run you should first, checking if the code is correct. if there is a typing mistake, an argument mistake, a language mistake, etc you should say something so that the code is rewritten by the agent who produced this code. Also check if the command was generated in the right format, with the specified language. The format should be:
@@ -111,16 +115,21 @@ def create_recon_team(llm_config, interaction_mode="NEVER"):
             - If they send full command, validate syntax, flags, and output redirection .
             - Do not give the user like this 'Make sure that the directory exists before running this command to avoid any errors' (That is your job)
             - Finally give it for Code-Executor
+            - For recon scans (Nmap, WhatWeb, Gobuster, Hakrawler): once every scanner's command is validated, call the `run_scan_batch` tool ONCE
+              with all of them, e.g. [{"name": "nmap", "command": "<cmd>", "depends_on": []}, ...].
+              Only fill `depends_on` when a command needs another command's output file; independent scans run in parallel.
             Always reply with this exact format:
             ```bash
             <correct bash command>
             ```
         """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode,
-    )
+    ), llm_config)
+    attach_local_validator(checker)
 
-    executor = LocalCommandLineCodeExecutor(timeout=3600, work_dir=".")
+    executor = create_code_executor(executor_mode, timeout=3600, work_dir=".")
+    executor = with_checkpoint(with_result_cache(executor, result_cache), checkpoint)
     code_executor = AssistantAgent(
         name="Code-Executor",
         llm_config=False,
@@ -128,28 +137,42 @@ def create_recon_team(llm_config, interaction_mode="NEVER"):
         human_input_mode=interaction_mode,
     )
 
-    file_reader = AssistantAgent(
+    file_reader = deferred(AssistantAgent(
         name="File-Reader",
-        system_message="Read and summarize result files.",
-        llm_config=llm_config,
+        system_message="Read and summarize result files. Prefer read_findings for nmap/gobuster/whatweb/nuclei results; use read_file for anything else.",
+        llm_config=False,
         human_input_mode=interaction_mode,
-    )
-    file_reader.register_for_llm(name="read_file", description="Read a scan result file")(read_file)
-    file_reader.register_for_execution(name="read_file", description="Read a scan result file")(read_file)
+    ), llm_config)
+    register_llm_tool(file_reader, name="read_file", description="Read a scan result file (paged: offset/limit bytes, start_line/end_line, tail lines, regex pattern)")(read_file)
+    file_reader.register_for_execution(name="read_file", description="Read a scan result file (paged: offset/limit bytes, start_line/end_line, tail lines, regex pattern)")(read_file)
+    register_llm_tool(file_reader, name="read_findings", description="Query parsed scan records (ports, paths, technologies, nuclei hits) instead of raw files")(read_findings)
+    file_reader.register_for_execution(name="read_findings")(read_findings)
+    register_llm_tool(file_reader, name="query_findings", description="Indexed query over all findings by target, tool, severity, URL or kind")(query_findings)
+    file_reader.register_for_execution(name="query_findings")(query_findings)
 
-    user_proxy = UserProxyAgent(
+    user_proxy = deferred(UserProxyAgent(
         name="User-Proxy",
         system_message="A human security analyst overseeing the pentest operation. You must confirm commands after validation by Code-Checker before they are executed.",
         is_termination_msg=lambda msg: "TERMINATE" in msg["content"],
         code_execution_config={"work_dir": ".", "use_docker": False},
         human_input_mode=interaction_mode,
-        llm_config=llm_config
-    )
+        llm_config=False
+    ), llm_config)
+    if executor_mode == "background":
+        register_job_tools(file_reader, user_proxy)
     user_proxy.register_for_execution(name="save_report")(save_report)
     user_proxy.register_for_execution(name="read_file")(read_file)
+    user_proxy.register_for_execution(name="read_findings")(read_findings)
+    user_proxy.register_for_execution(name="query_findings")(query_findings)
+    register_llm_tool(checker, name="run_scan_batch", description="Run validated recon commands in parallel as a dependency graph")(run_scan_batch)
+    user_proxy.register_for_execution(name="run_scan_batch")(run_scan_batch)
+    register_llm_tool(nmap_agent, name="tcp_prescan", description="Fast TCP connect sweep of all ports; returns the open ports to give nmap -sV")(tcp_prescan)
+    user_proxy.register_for_execution(name="tcp_prescan")(tcp_prescan)
+    register_llm_tool(directory_scanner, name="probe_directories", description="In-process directory brute force for short wordlists (gobuster output format, header.txt cookie)")(probe_directories)
+    user_proxy.register_for_execution(name="probe_directories")(probe_directories)
 
 
-    report_writer = AssistantAgent(
+    report_writer = deferred(AssistantAgent(
         name="Report-Writer",
         system_message="""
             You're a professional security report writer.
@@ -167,26 +190,36 @@ def create_recon_team(llm_config, interaction_mode="NEVER"):
 
             After writing the report, you MUST call the `save_report` tool to save the file. Do not skip this step.
         """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode
-    )
-    report_writer.register_for_llm(name="save_report", description="Save the final recon report")(save_report)
+    ), llm_config)
+    register_llm_tool(report_writer, name="save_report", description="Save the final recon report")(save_report)
     report_writer.register_for_execution(name="save_report")(save_report)
+    register_llm_tool(report_writer, name="query_findings", description="Indexed query over all findings by target, tool, severity, URL or kind")(query_findings)
+    report_writer.register_for_execution(name="query_findings")(query_findings)
 
 
-    recon_summarizer = ConversableAgent(
+    recon_summarizer = deferred(ConversableAgent(
         name="Recon-Summarizer",
         system_message="Analyze recon results, highlight key findings. ",
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode,
-    )
+    ), llm_config)
 
 
     recon_team = GroupChat(
         agents=[user_proxy, file_reader, nmap_agent,checker, code_executor, whatweb_agent, directory_scanner, report_writer],
         messages=[],
-        max_round=50
+        max_round=50,
+        speaker_selection_method=WorkflowSpeakerSelector(
+            steps=[file_reader, nmap_agent, whatweb_agent, directory_scanner, report_writer],
+            checker=checker, approver=user_proxy, executor=code_executor, reader=file_reader,
+            batched=[nmap_agent, whatweb_agent, directory_scanner],
+        ),
     )
+    attach_history_compaction(recon_team.agents)
+    if checkpoint is not None:
+        checkpoint.track(recon_team)
     recon_manager = GroupChatManager(
         name="Recon-Manager",
         groupchat=recon_team,
@@ -198,12 +231,13 @@ def create_recon_team(llm_config, interaction_mode="NEVER"):
         You MUST follow this strict sequence of actions for each tool:
         0. Reading header.txt to get cookie.
         1. Ask for target IP/URL.
-        2. Nmap-Agent generate command ➔ Code-Checker ➔ User-Proxy approve ➔ Code-Executor run.
+        2. Nmap-Agent generate command ➔ Code-Checker validate.
         3. WhatWeb-Agent same flow.
         4. Directory-Scanner same flow.
         5. Endpoint-Crawler same flow.
-        6. After all tools done, call Report-Writer to summarize recon results.
-        7. After Report-Writer finishes:
+        6. Code-Checker calls `run_scan_batch` once with all validated commands ➔ User-Proxy approve and run it (independent scans run in parallel).
+        7. After the batch finishes, call Report-Writer to summarize recon results.
+        8. After Report-Writer finishes:
         - Send message "TERMINATE" to User-Proxy to end recon phase.
         ✅ No tool should be skipped.
         """
@@ -0,0 +1,99 @@
+#resolver.py
+import ipaddress
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+DNS_TTL = 300          # seconds a successful lookup is reused
+NEGATIVE_TTL = 30      # seconds a failed lookup is remembered (no retry storm on typos / dead names)
+RESOLVER_WORKERS = 16  # parallel getaddrinfo calls for a batch of targets
+
+
+def host_of(target: str) -> str:
+    """Hostname of a host, host:port, [v6]:port or URL target ('' if there is none)."""
+    target = (target or "").strip()
+    try:
+        return str(ipaddress.ip_address(target.strip("[]")))
+    except ValueError:
+        pass
+    host = urlparse(target if "://" in target else f"http://{target}").hostname or ""
+    return host.rstrip(".").lower()
+
+
+class Resolver:
+    """
+    getaddrinfo with a TTL cache (and a shorter negative cache), returning the
+    IPv4 addresses first and then the IPv6 ones. resolve_many() looks up a whole
+    target list in one parallel batch on a thread pool.
+    """
+
+    def __init__(self, ttl=DNS_TTL, negative_ttl=NEGATIVE_TTL, workers=RESOLVER_WORKERS):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.workers = workers
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, host):
+        try:
+            infos = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        except (socket.gaierror, UnicodeError, OSError) as e:
+            return [], str(e)
+        v4 = [info[4][0] for info in infos if info[0] == socket.AF_INET]
+        v6 = [info[4][0] for info in infos if info[0] == socket.AF_INET6]
+        return list(dict.fromkeys(v4 + v6)), ""
+
+    def addresses(self, target):
+        """(addresses, error) for a target, served from the cache while fresh."""
+        host = host_of(target)
+        if not host:
+            return [], f"no hostname in {target!r}"
+        try:
+            return [str(ipaddress.ip_address(host))], ""
+        except ValueError:
+            pass
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(host)
+            if cached and cached[0] > now:
+                return cached[1], cached[2]
+        addresses, error = self._lookup(host)
+        with self._lock:
+            self._cache[host] = (now + (self.ttl if addresses else self.negative_ttl), addresses, error)
+        return addresses, error
+
+    def resolve(self, target):
+        """Addresses of a target; raises ValueError("Error resolving IP: ...") if it does not resolve."""
+        addresses, error = self.addresses(target)
+        if not addresses:
+            raise ValueError(f"Error resolving IP: {error}")
+        return addresses
+
+    def resolve_many(self, targets):
+        """{target: addresses or error string} for many targets, resolved concurrently."""
+        targets = list(dict.fromkeys(targets))
+        if not targets:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(targets)))) as pool:
+            results = list(pool.map(self.addresses, targets))
+        return {t: (a if a else f"Error resolving IP: {e}") for t, (a, e) in zip(targets, results)}
+
+    def invalidate(self, target=None):
+        with self._lock:
+            if target is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(host_of(target), None)
+
+
+resolver = Resolver()
+
+
+def get_ip_from_url(url):
+    """First address of a URL / host:port target, or an "Error resolving IP: ..." string."""
+    try:
+        return resolver.resolve(url)[0]
+    except ValueError as e:
+        return str(e)
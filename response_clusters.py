@@ -0,0 +1,207 @@
+#response_clusters.py
+import asyncio
+import hashlib
+import os
+import shlex
+import uuid
+from collections import defaultdict
+from urllib.parse import urljoin, urlparse
+
+from findings import parse_gobuster
+
+BASELINE_PROBES = 3            # random paths requested per target to learn its "not found" answer
+SIZE_SLACK = 32                # bytes of difference still treated as the same page (echoed path, tokens)
+EXAMPLES = 5                   # paths listed in a collapsed cluster's summary line
+NOISE_LABELS = ("soft-404", "auth-redirect")
+
+
+def _body_hash(body, path):
+    # Soft-404 pages often echo the requested path; drop it so every miss hashes the same.
+    body = body.replace(path.encode("latin-1", "replace"), b"").replace(path.lstrip("/").encode("latin-1", "replace"), b"")
+    return hashlib.sha1(body).hexdigest()[:16]
+
+
+def normalize_redirect(location, base_url, path):
+    """Path a redirect points to, resolved against the requested URL (../../login.php -> /login.php)."""
+    if not location:
+        return ""
+    target = urlparse(urljoin(base_url.rstrip("/") + path, location))
+    return (target.path or "/").lower()
+
+
+def describe(record, base_url):
+    """Cluster key and comparable fields of one response record (dir_prober dict or parsed gobuster line)."""
+    status, path = record["status"], record["path"]
+    redirect = normalize_redirect(record.get("redirect", ""), base_url, path) if status and 300 <= status < 400 else ""
+    body = record.get("body")
+    digest = _body_hash(body, path) if body is not None and not redirect else ""
+    if redirect:
+        key = (status, "redirect", redirect)
+    elif digest:
+        key = (status, "body", digest)
+    else:
+        key = (status, "size", record.get("size"))
+    return {"key": key, "status": status, "redirect": redirect, "hash": digest,
+            "size": record.get("size") or 0, "path": path}
+
+
+def _same_response(sig, base):
+    if sig["status"] != base["status"]:
+        return False
+    if sig["redirect"] or base["redirect"]:
+        return sig["redirect"] == base["redirect"]
+    if sig["hash"] and base["hash"]:
+        return sig["hash"] == base["hash"]
+    slack = SIZE_SLACK + 2 * abs(len(sig["path"]) - len(base["path"]))
+    return abs(sig["size"] - base["size"]) <= slack
+
+
+async def _fetch_baselines_async(base_url, cookie):
+    from dir_prober import probe_paths_async
+
+    token = uuid.uuid4().hex[:12]
+    words = [token, f"{token}.php", f"{token}/"][:BASELINE_PROBES]
+    misses = await probe_paths_async(base_url, words, concurrency=len(words), rate=0, cookie=cookie)
+    # The same protected entry page without the session shows where unauthenticated requests are sent.
+    anonymous = await probe_paths_async(base_url, ["/"], concurrency=1, rate=0, cookie="")
+    # Auth first: on a logged-out session random paths redirect to the login page too.
+    baselines = [("auth-redirect", describe(r, base_url)) for r in anonymous
+                 if r["status"] is not None and 300 <= r["status"] < 400]
+    baselines += [("soft-404", describe(r, base_url)) for r in misses if r["status"] is not None]
+    return baselines
+
+
+def fetch_baselines(base_url, cookie=""):
+    """[(label, signature)] for random missing paths (soft-404) and the cookieless root (auth redirect)."""
+    try:
+        return asyncio.run(_fetch_baselines_async(base_url, cookie))
+    except (OSError, ValueError):
+        return []
+
+
+def classify(records, base_url, baselines):
+    """
+    Set record["label"] to soft-404 / auth-redirect when the record's cluster
+    (same status + redirect target, body hash or size) matches a baseline.
+    Returns {cluster key: [records]}.
+    """
+    clusters = defaultdict(list)
+    for record in records:
+        if record.get("status") is None:
+            continue
+        sig = describe(record, base_url)
+        record["cluster"] = sig["key"]
+        clusters[sig["key"]].append((record, sig))
+    for members in clusters.values():
+        label = ""
+        for name, base in baselines:
+            if _same_response(members[0][1], base):
+                label = name
+                break
+        if not label and members[0][1]["redirect"]:
+            # Same target as the auth redirect even if the status differs (301/302/303).
+            auth = {b["redirect"] for n, b in baselines if n == "auth-redirect"}
+            label = "auth-redirect" if members[0][1]["redirect"] in auth else ""
+        for record, _ in members:
+            record["label"] = label
+    return {key: [r for r, _ in members] for key, members in clusters.items()}
+
+
+def collapse(records, base_url, baselines, line_format):
+    """(kept lines, summary lines): noise clusters become one `# [label] N x ...` comment each."""
+    clusters = classify(records, base_url, baselines)
+    kept, summary = [], []
+    for record in records:
+        if record.get("status") is not None and record.get("label") not in NOISE_LABELS:
+            kept.append(line_format(record))
+    for key, members in clusters.items():
+        label = members[0].get("label")
+        if label in NOISE_LABELS:
+            status, kind, value = key
+            what = f"[--> {value}]" if kind == "redirect" else (f"[Size: {value}]" if kind == "size" else f"[body {value}]")
+            examples = ", ".join(r["path"] for r in members[:EXAMPLES]) + (" ..." if len(members) > EXAMPLES else "")
+            summary.append(f"# [{label}] {len(members)} x (Status: {status}) {what}: {examples}")
+    return kept, summary
+
+
+def collapse_gobuster_file(path, base_url, cookie=""):
+    """
+    Rewrite a gobuster result file without its soft-404 / auth-redirect clusters
+    (one summary comment per collapsed cluster). The untouched file is kept as raw_<name>.
+    Returns a one-line note, or "" when nothing was collapsed.
+    """
+    from dir_prober import gobuster_line
+
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+    except OSError:
+        return ""
+    records = [{"path": p.path, "status": p.status, "size": p.size, "redirect": p.redirect} for p in parse_gobuster(text)]
+    if not records:
+        return ""
+    kept, summary = collapse(records, base_url, fetch_baselines(base_url, cookie), gobuster_line)
+    if not summary:
+        return ""
+    directory, name = os.path.split(path)
+    raw_path = os.path.join(directory, f"raw_{name}")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("\n".join(kept + summary) + "\n")
+    os.replace(path, raw_path)
+    os.replace(tmp, path)
+    return (f"[clusters] {path}: kept {len(kept)} of {len(records)} result(s); "
+            f"{len(summary)} noise cluster(s) collapsed, full list in {raw_path}")
+
+
+def _option(tokens, *names):
+    for i, token in enumerate(tokens):
+        for name in names:
+            if token == name and i + 1 < len(tokens):
+                return tokens[i + 1]
+            if token.startswith(name + "="):
+                return token.split("=", 1)[1]
+    return ""
+
+
+def _tee_file(segment):
+    try:
+        tokens = shlex.split(segment)
+    except ValueError:
+        return ""
+    if not tokens or os.path.basename(tokens[0]) != "tee":
+        return ""
+    files = [t for t in tokens[1:] if not t.startswith("-")]
+    return files[0] if files else ""
+
+
+def scan_output_file(command, tokens):
+    """Where a gobuster command writes its results: -o/--output, a trailing `> file`, or `| tee file`."""
+    output = _option(tokens, "-o", "--output")
+    if output:
+        return output
+    segments = command.split("|")
+    if len(segments) > 1:
+        output = _tee_file(segments[-1])
+        if output:
+            return output
+    # code_executors (and autogen with it) is only needed for commands without -o.
+    from code_executors import split_output_redirect
+
+    redirect = split_output_redirect(command)
+    return redirect[1] if redirect else ""
+
+
+def collapse_scan_output(command):
+    """For a finished `gobuster dir -u URL` command writing FILE, collapse FILE in place (see collapse_gobuster_file)."""
+    try:
+        tokens = shlex.split(command.split("|")[0])
+    except ValueError:
+        return ""
+    tokens = [t for t in tokens if t != "sudo"]
+    if len(tokens) < 2 or os.path.basename(tokens[0]) != "gobuster" or tokens[1] != "dir":
+        return ""
+    url, output = _option(tokens, "-u", "--url"), scan_output_file(command, tokens)
+    if not url or not output:
+        return ""
+    return collapse_gobuster_file(output, url, _option(tokens, "-c", "--cookies"))
@@ -0,0 +1,322 @@
+#result_cache.py
+import functools
+import hashlib
+import json
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import TYPE_CHECKING, List
+from urllib.parse import urlparse
+
+from command_validator import OK, extract_commands, validate_command
+from governor import command_target, command_tool
+from resolver import resolver
+
+if TYPE_CHECKING:
+    from autogen.coding.base import CodeBlock, CommandLineCodeResult
+
+CACHE_DIR = ".cache/results"
+DEFAULT_TTL = 24 * 3600
+FINGERPRINT_TTL = 60
+FINGERPRINT_TIMEOUT = 3
+MAX_STORED_OUTPUT = 20000
+
+# Recon/vuln scanners whose artifacts depend only on the target; exploit tools are never cached.
+CACHEABLE_TOOLS = {"nmap", "whatweb", "gobuster", "hakrawler", "nuclei"}
+VERSION_ARGS = {
+    "nmap": ["--version"],
+    "whatweb": ["--version"],
+    "gobuster": ["version"],
+    "nuclei": ["-version"],
+}
+
+
+_fingerprints = {}
+_fingerprint_lock = threading.Lock()
+_current = None
+
+
+def _sha(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_sha(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def normalize_command(command):
+    try:
+        return " ".join(shlex.split(command))
+    except ValueError:
+        return re.sub(r"\s+", " ", command.strip())
+
+
+def _tokens(command):
+    try:
+        return shlex.split(command)
+    except ValueError:
+        return command.split()
+
+
+@functools.lru_cache(maxsize=None)
+def tool_version(tool):
+    """First line of `<tool> --version` (or the binary's size/mtime when the tool has no version flag)."""
+    path = shutil.which(tool)
+    if path is None:
+        return ""
+    args = VERSION_ARGS.get(tool)
+    if args:
+        try:
+            proc = subprocess.run([path] + args, capture_output=True, text=True, errors="replace", timeout=15)
+            for line in (proc.stdout + proc.stderr).splitlines():
+                if line.strip():
+                    return line.strip()
+        except (OSError, subprocess.SubprocessError):
+            pass
+    st = os.stat(path)
+    return f"{path}:{st.st_size}:{int(st.st_mtime)}"
+
+
+def _probe_target(target):
+    url = target if "://" in target else f"http://{target}"
+    parsed = urlparse(url)
+    host, port = parsed.hostname or "", parsed.port
+    ips = sorted(resolver.addresses(url)[0])
+    http = []
+    if "://" in target or port:
+        try:
+            with urllib.request.urlopen(url, timeout=FINGERPRINT_TIMEOUT) as resp:
+                # Headers only: bodies of dynamic pages (CSRF tokens, timestamps) change on every request.
+                http = [resp.status] + [resp.headers.get(h, "") for h in ("Server", "X-Powered-By", "ETag", "Last-Modified")]
+        except urllib.error.HTTPError as e:
+            http = [e.code, e.headers.get("Server", "")]
+        except (OSError, ValueError):
+            http = ["unreachable"]
+    return {"host": host, "port": port, "ips": ips, "http": http}
+
+
+def target_fingerprint(target):
+    """Resolved addresses plus the HTTP status/server headers of the target, cached for FINGERPRINT_TTL seconds."""
+    if not target:
+        return {}
+    now = time.time()
+    with _fingerprint_lock:
+        cached = _fingerprints.get(target)
+        if cached and now - cached[0] < FINGERPRINT_TTL:
+            return cached[1]
+    fingerprint = _probe_target(target)
+    with _fingerprint_lock:
+        _fingerprints[target] = (now, fingerprint)
+    return fingerprint
+
+
+def _input_hashes(command, outputs):
+    """Hashes of local input files (URL lists, wordlists) the command reads."""
+    hashes = {}
+    for token in _tokens(command)[1:]:
+        if token not in outputs and not token.startswith("-") and os.path.isfile(token):
+            hashes[token] = _file_sha(token)
+    return hashes
+
+
+class ResultCache:
+    """
+    Content-addressed store of scan artifacts.
+    Key: normalized command + target fingerprint + tool version (+ hashes of input files).
+    Artifacts are stored once under objects/<sha256>; entries/<key>.json maps a key to them.
+    """
+
+    def __init__(self, root=CACHE_DIR, ttl=DEFAULT_TTL):
+        self.root = root
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(root, "entries"), exist_ok=True)
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest)
+
+    def _entry_path(self, key):
+        return os.path.join(self.root, "entries", f"{key}.json")
+
+    def describe(self, command):
+        """Cache key material for a command, or None if the command is not cacheable."""
+        command = command.strip()
+        tool = command_tool(command)
+        if tool not in CACHEABLE_TOOLS:
+            return None
+        verdict = validate_command(command)
+        if verdict.status != OK or not verdict.outputs:
+            return None
+        target = command_target(command)
+        material = {
+            "command": normalize_command(command),
+            "target": target,
+            "fingerprint": target_fingerprint(target),
+            "tool_version": tool_version(tool),
+            "inputs": _input_hashes(command, verdict.outputs),
+        }
+        key = _sha(json.dumps(material, sort_keys=True, default=str).encode())
+        return key, material, verdict.outputs
+
+    def lookup(self, command):
+        """Restore the artifacts of a cached run into place; returns the stored output or None on a miss."""
+        described = self.describe(command)
+        if described is None:
+            return None
+        key, _, _ = described
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if time.time() - entry["created"] > self.ttl or not all(
+                os.path.exists(self._object_path(d)) for d in entry["artifacts"].values()):
+            self._remove(path)
+            self.misses += 1
+            return None
+        for out_path, digest in entry["artifacts"].items():
+            if os.path.exists(out_path) and _file_sha(out_path) == digest:
+                continue
+            os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+            tmp = f"{out_path}.cache-tmp"
+            shutil.copyfile(self._object_path(digest), tmp)
+            os.replace(tmp, out_path)
+        self.hits += 1
+        age = int(time.time() - entry["created"])
+        return f"[cache] reused result from {age}s ago ({', '.join(entry['artifacts'])})\n{entry['output']}"
+
+    def store(self, command, output=""):
+        """Save the artifacts written by a successful command."""
+        described = self.describe(command)
+        if described is None:
+            return False
+        key, material, outputs = described
+        artifacts = {}
+        for out_path in outputs:
+            if not os.path.isfile(out_path):
+                return False
+            digest = _file_sha(out_path)
+            obj = self._object_path(digest)
+            if not os.path.exists(obj):
+                os.makedirs(os.path.dirname(obj), exist_ok=True)
+                shutil.copyfile(out_path, f"{obj}.tmp")
+                os.replace(f"{obj}.tmp", obj)
+            artifacts[out_path] = digest
+        entry = dict(material, created=time.time(), artifacts=artifacts, output=(output or "")[-MAX_STORED_OUTPUT:])
+        tmp = f"{self._entry_path(key)}.tmp"
+        with self._lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f, indent=2, default=str)
+            os.replace(tmp, self._entry_path(key))
+        return True
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def invalidate(self, target="", tool=""):
+        """Drop cached entries (all, or those whose target / tool matches). Returns the number removed."""
+        removed = 0
+        entries_dir = os.path.join(self.root, "entries")
+        for name in os.listdir(entries_dir):
+            path = os.path.join(entries_dir, name)
+            if target or tool:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        entry = json.load(f)
+                except (OSError, ValueError):
+                    entry = {}
+                if target and target not in entry.get("target", ""):
+                    continue
+                if tool and command_tool(entry.get("command", "")) != tool:
+                    continue
+            self._remove(path)
+            removed += 1
+        self._collect_garbage()
+        return removed
+
+    def _collect_garbage(self):
+        """Delete objects no entry refers to any more."""
+        live = set()
+        entries_dir = os.path.join(self.root, "entries")
+        for name in os.listdir(entries_dir):
+            try:
+                with open(os.path.join(entries_dir, name), "r", encoding="utf-8") as f:
+                    live.update(json.load(f).get("artifacts", {}).values())
+            except (OSError, ValueError):
+                continue
+        objects_dir = os.path.join(self.root, "objects")
+        for sub in os.listdir(objects_dir):
+            for digest in os.listdir(os.path.join(objects_dir, sub)):
+                if digest not in live:
+                    self._remove(os.path.join(objects_dir, sub, digest))
+
+    def activate(self):
+        """Make this the cache consulted by run_scan_batch."""
+        global _current
+        _current = self
+        return self
+
+
+def current_result_cache():
+    return _current
+
+
+class CachedCodeExecutor:
+    """Wraps a code executor: a shell block holding one cacheable scan is answered from the result cache."""
+
+    def __init__(self, executor, cache):
+        from code_executors import BackgroundCommandLineCodeExecutor
+
+        self.executor = executor
+        self.cache = cache
+        # Background jobs return before their artifacts are complete, so only lookups apply there.
+        self.store_results = not isinstance(executor, BackgroundCommandLineCodeExecutor)
+
+    @property
+    def code_extractor(self):
+        return self.executor.code_extractor
+
+    def execute_code_blocks(self, code_blocks: List["CodeBlock"]) -> "CommandLineCodeResult":
+        from autogen.coding.base import CommandLineCodeResult
+        from code_executors import SHELL_LANGS
+
+        outputs, exit_code, code_file = [], 0, None
+        for block in code_blocks:
+            commands = extract_commands(f"```bash\n{block.code}\n```") if block.language in SHELL_LANGS else []
+            cached = self.cache.lookup(commands[0]) if len(commands) == 1 else None
+            if cached is not None:
+                outputs.append(cached)
+                continue
+            result = self.executor.execute_code_blocks([block])
+            if self.store_results and len(commands) == 1 and result.exit_code == 0:
+                self.cache.store(commands[0], result.output)
+            outputs.append(result.output)
+            exit_code, code_file = result.exit_code, result.code_file
+            if exit_code != 0:
+                break
+        return CommandLineCodeResult(exit_code=exit_code, output="\n".join(outputs), code_file=code_file)
+
+    def restart(self):
+        self.executor.restart()
+
+
+def with_result_cache(executor, cache):
+    return CachedCodeExecutor(executor, cache) if cache is not None else executor
@@ -0,0 +1,87 @@
+#session_cache.py
+import json
+import os
+import re
+import threading
+
+from browser_pool import origin_of
+
+HEADER_FILE = "header.txt"
+SESSION_DIR = "pentest_results/sessions"
+
+_header_cache = {}
+_lock = threading.Lock()
+
+
+def header_cookie_pairs(header_file: str = HEADER_FILE) -> list:
+    """Parse `Cookie: a=b; c=d` from header.txt once per file modification."""
+    try:
+        mtime = os.path.getmtime(header_file)
+    except OSError:
+        return []
+    with _lock:
+        cached = _header_cache.get(header_file)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    raw = open(header_file, "r", encoding="utf-8").read().strip()
+    if raw.lower().startswith("cookie:"):
+        raw = raw.split(":", 1)[1].strip()
+    pairs = []
+    for part in raw.split(";"):
+        part = part.strip()
+        if "=" not in part:
+            continue
+        name, val = part.split("=", 1)
+        pairs.append((name.strip(), val.strip()))
+    with _lock:
+        _header_cache[header_file] = (mtime, pairs)
+    return pairs
+
+
+def header_cookies(url: str, header_file: str = HEADER_FILE) -> list:
+    """Cookies from header.txt in the format expected by BrowserContext.add_cookies."""
+    return [{"name": name, "value": value, "url": url} for name, value in header_cookie_pairs(header_file)]
+
+
+def session_file(url: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", origin_of(url)).strip("_")
+    return os.path.join(SESSION_DIR, f"{slug}.json")
+
+
+def load_session(url: str, header_file: str = HEADER_FILE):
+    """
+    Return the saved storage_state path for url's origin, or None.
+    A session older than header.txt is ignored so a freshly pasted cookie wins.
+    """
+    path = session_file(url)
+    if not os.path.exists(path):
+        return None
+    if os.path.exists(header_file) and os.path.getmtime(header_file) > os.path.getmtime(path):
+        return None
+    return path
+
+
+def _write_state(url: str, state: dict) -> str:
+    path = session_file(url)
+    os.makedirs(SESSION_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+    return path
+
+
+def save_session(context, url: str) -> str:
+    """Persist a (sync API) BrowserContext's cookies/localStorage for url's origin."""
+    return _write_state(url, context.storage_state())
+
+
+async def save_session_async(context, url: str) -> str:
+    return _write_state(url, await context.storage_state())
+
+
+def invalidate_session(url: str):
+    try:
+        os.remove(session_file(url))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,141 @@
+#speaker_selection.py
+from command_validator import extract_commands
+
+LLM_FALLBACK = "auto"
+
+
+class _History:
+    def __init__(self, agents):
+        self.agents = agents
+        self.messages = []
+
+
+class WorkflowSpeakerSelector:
+    """
+    Deterministic speaker selection for the team checklists
+    (generate -> Code-Checker -> User-Proxy -> Code-Executor -> File-Reader -> next step).
+    Pass an instance as GroupChat(speaker_selection_method=...). It returns "auto"
+    (LLM selection by the manager) only for turns the rules can't place.
+
+    steps   - agents in checklist order; the same agent may appear more than once.
+              A step that emits a bash block goes through the checker pipeline,
+              a step that emits tool calls gets them executed and speaks again,
+              a plain message completes the step.
+    batched - steps whose validated commands are not executed one by one; once the last
+              consecutive batched step is validated the checker speaks again to submit
+              them all with run_scan_batch.
+    """
+
+    def __init__(self, steps, checker, approver, executor=None, reader=None, batched=()):
+        self.steps = list(steps)
+        self.checker = checker
+        self.approver = approver
+        self.executor = executor
+        self.reader = reader
+        self.batched = set(batched)
+        self.index = 0
+        self.pending_batch = 0
+        self.batch_submitted = False
+        self.awaiting_read = False
+        self.tool_caller = None
+        self.rule_selections = 0
+        self.llm_fallbacks = 0
+
+    def __call__(self, last_speaker, groupchat):
+        choice = self._select(last_speaker, groupchat)
+        if isinstance(choice, str):
+            self.llm_fallbacks += 1
+        else:
+            self.rule_selections += 1
+        return choice
+
+    def replay(self, groupchat, messages):
+        """Rebuild the checklist position from a restored history (checkpoint resume); the last message is re-sent by the caller."""
+        agents = {agent.name: agent for agent in groupchat.agents}
+        history = _History(groupchat.agents)
+        for message in messages[:-1]:
+            history.messages.append(message)
+            speaker = agents.get(message.get("name"))
+            if speaker is not None:
+                self._select(speaker, history)
+
+    def _current(self):
+        return self.steps[self.index] if self.index < len(self.steps) else None
+
+    def _advance(self):
+        self.index += 1
+        nxt = self._current()
+        if self.pending_batch and nxt not in self.batched:
+            return self.checker
+        return nxt if nxt is not None else LLM_FALLBACK
+
+    def _tool_executor(self, groupchat, message, last_speaker):
+        funcs = [call["function"]["name"] for call in message.get("tool_calls") or [] if call.get("type") == "function"]
+        if message.get("function_call"):
+            funcs.append(message["function_call"]["name"])
+        capable = [agent for agent in groupchat.agents if agent.can_execute_function(funcs)]
+        for preferred in (last_speaker, self.approver):
+            if preferred in capable:
+                return preferred
+        return capable[0] if capable else LLM_FALLBACK
+
+    def _select(self, last_speaker, groupchat):
+        messages = groupchat.messages
+        current = self._current()
+        if not messages:
+            return current or LLM_FALLBACK
+        message = messages[-1]
+        content = message.get("content") if isinstance(message.get("content"), str) else ""
+
+        if message.get("tool_calls") or message.get("function_call"):
+            self.tool_caller = last_speaker
+            if last_speaker is self.checker and self.pending_batch:
+                self.batch_submitted = True
+            return self._tool_executor(groupchat, message, last_speaker)
+        if message.get("role") == "tool" or message.get("tool_responses"):
+            caller, self.tool_caller = self.tool_caller, None
+            return caller or LLM_FALLBACK
+
+        has_code = bool(extract_commands(content))
+
+        if last_speaker is self.checker:
+            if self.batch_submitted:
+                self.pending_batch, self.batch_submitted = 0, False
+                return current or LLM_FALLBACK
+            if self.pending_batch and current not in self.batched:
+                # The checker already echoed the last batched command; let it submit the batch.
+                return self.checker
+            if not has_code:
+                # Rejected: the author of the current step rewrites its command.
+                return current or LLM_FALLBACK
+            if current in self.batched:
+                self.pending_batch += 1
+                return self._advance()
+            return self.approver
+
+        if last_speaker is self.approver:
+            previous = messages[-2] if len(messages) > 1 else {}
+            approving = previous.get("name") == self.checker.name and extract_commands(previous.get("content") or "")
+            if content.startswith("exitcode:"):
+                # UserProxyAgent ran the approved block itself.
+                self.awaiting_read = True
+                return self.reader or self._advance()
+            if approving:
+                if not content.strip() and self.executor is not None:
+                    return self.executor
+                # Human feedback ("scan only port 80") goes back through the checker.
+                return self.checker
+            return current or LLM_FALLBACK
+
+        if self.executor is not None and last_speaker is self.executor:
+            self.awaiting_read = True
+            return self.reader or self._advance()
+
+        if self.awaiting_read and last_speaker is self.reader:
+            self.awaiting_read = False
+            return self._advance()
+
+        if last_speaker is current:
+            return self.checker if has_code else self._advance()
+
+        return LLM_FALLBACK
@@ -0,0 +1,138 @@
+#url_store.py
+import os
+import posixpath
+import re
+import string
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+CAPTURED_URLS_FILE = "captured_urls.txt"
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+_ESCAPE_RE = re.compile(r"%([0-9A-Fa-f]{2})")
+# Unreserved characters (RFC 3986 2.3) minus ".", which stays encoded so %2E%2E never becomes a "..".
+_DECODABLE = set(string.ascii_letters + string.digits + "-_~")
+
+
+def _normalize_escape(match):
+    char = chr(int(match.group(1), 16))
+    return char if char in _DECODABLE else "%" + match.group(1).upper()
+
+
+def _normalize_path(path):
+    """
+    Dot segments and duplicate slashes resolved on the raw path, then only escapes of
+    unreserved characters decoded (RFC 3986 6.2.2): ..%2F..%2Fetc%2Fpasswd stays one segment.
+    """
+    path = path or "/"
+    trailing = path.endswith("/")
+    path = "/" + posixpath.normpath(path).lstrip("/") if path != "/" else "/"
+    path = _ESCAPE_RE.sub(_normalize_escape, path)
+    return path + "/" if trailing and path != "/" else path
+
+
+def _split(url):
+    parts = urlsplit(url.strip() if "://" in url else f"http://{url.strip()}")
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").rstrip(".").lower()
+    if ":" in host:
+        host = f"[{host}]"
+    port = parts.port
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+    params = sorted(parse_qsl(parts.query, keep_blank_values=True), key=lambda kv: kv[0])
+    return scheme, netloc, _normalize_path(parts.path), params
+
+
+def canonicalize(url):
+    """Lower-case scheme/host, no default port, no fragment, clean path, query parameters sorted by name."""
+    scheme, netloc, path, params = _split(url)
+    return urlunsplit((scheme, netloc, path, urlencode(params), ""))
+
+
+def signature(url):
+    """Endpoint plus parameter names (values ignored): one entry per injection surface."""
+    scheme, netloc, path, params = _split(url)
+    names = sorted({name.lower() for name, _ in params})
+    return f"{scheme}://{netloc}{path}" + ("?" + "&".join(names) if names else "")
+
+
+class URLStore:
+    """
+    Set of captured URLs backed by a text file (one canonical URL per line), deduplicated
+    by endpoint + parameter-name signature. The index is rebuilt only when the file
+    changes on disk, and every update rewrites the file atomically (tmp + rename).
+    """
+
+    def __init__(self, path=CAPTURED_URLS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._urls = {}
+        self._dirty = False
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+            return os.path.abspath(self.path), st.st_mtime_ns, st.st_size
+        except OSError:
+            return os.path.abspath(self.path), None, 0
+
+    def _load(self):
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+        self._urls, lines = {}, []
+        if stamp[1] is not None:
+            with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+                lines = [line.strip() for line in f if line.strip()]
+            for line in lines:
+                if not line.startswith("#"):
+                    self._urls.setdefault(signature(line), canonicalize(line))
+        # Files written by plain appends may hold duplicates or non-canonical lines; fix them on the next add().
+        self._dirty = lines != list(self._urls.values())
+        self._stamp = stamp
+
+    def _write(self, urls):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("".join(u + "\n" for u in urls))
+        os.replace(tmp, self.path)
+        self._stamp = self._file_stamp()
+        self._dirty = False
+
+    def add(self, urls):
+        """Store the URLs whose signature is new; returns those (canonical form), in input order."""
+        with self._lock:
+            self._load()
+            added = []
+            for url in urls:
+                if not url or not url.strip():
+                    continue
+                key = signature(url)
+                if key not in self._urls:
+                    self._urls[key] = canonicalize(url)
+                    added.append(self._urls[key])
+            if added or self._dirty:
+                self._write(list(self._urls.values()))
+            return added
+
+    def urls(self):
+        with self._lock:
+            self._load()
+            return list(self._urls.values())
+
+    def __contains__(self, url):
+        with self._lock:
+            self._load()
+            return signature(url) in self._urls
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._urls)
+
+
+captured_urls = URLStore()
@@ -1,28 +1,38 @@
 import os
 from autogen.agentchat import AssistantAgent, ConversableAgent, UserProxyAgent, GroupChat, GroupChatManager
-from autogen.coding.local_commandline_code_executor import LocalCommandLineCodeExecutor
+from checkpoint import with_checkpoint
+from code_executors import create_code_executor, register_job_tools
+from command_validator import attach_local_validator
 from reading_function import read_file
+from findings import read_findings
+from findings_db import query_findings
+from history_compaction import attach_history_compaction
+from lazy_agents import deferred, register_llm_tool
 from report_save import save_report
-from web_form_analyzer import analyze_and_capture_url
+from result_cache import with_result_cache
+from speaker_selection import WorkflowSpeakerSelector
+from web_form_analyzer import analyze_and_capture_url, analyze_and_capture_urls
 
 
-def create_vuln_team(llm_config, interaction_mode):    
+def create_vuln_team(llm_config, interaction_mode, executor_mode="blocking", checkpoint=None, result_cache=None):    
     # Ensure output folder exists
     os.makedirs("pentest_results/vulnscan", exist_ok=True)
 
     # === Parameter-URL Extractor Agent ===
-    param_agent = ConversableAgent(
+    param_agent = deferred(ConversableAgent(
         name="Param-URL-Extractor",
         system_message="""
         You're a parameterized-URL extractor. You take a base URL, auto-login and auto-submit forms,
         then return the final URL (which may include parameters). Use the analyze_form_and_capture_url tool.
+        When you have several URLs (or a wordlist / gobuster result file), call analyze_forms_and_capture_urls once instead of one call per URL.
         You should choose 5 url that can be vulnerability
         """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode="NEVER"
-    )
+    ), llm_config)
     # register the tool both for LLm planning and execution
-    param_agent.register_for_llm(
+    register_llm_tool(
+        param_agent,
         name="analyze_form_and_capture_url",
         description="Analyze a webpage form and capture resulting URL."
     )(analyze_and_capture_url)
@@ -30,9 +40,18 @@ def create_vuln_team(llm_config, interaction_mode):
         name="analyze_form_and_capture_url",
         description="Analyze a webpage form and capture resulting URL."
     )(analyze_and_capture_url)
+    register_llm_tool(
+        param_agent,
+        name="analyze_forms_and_capture_urls",
+        description="Analyze many webpages concurrently (URLs, paths + base_url, or a wordlist/gobuster file) and capture resulting URLs."
+    )(analyze_and_capture_urls)
+    param_agent.register_for_execution(
+        name="analyze_forms_and_capture_urls",
+        description="Analyze many webpages concurrently (URLs, paths + base_url, or a wordlist/gobuster file) and capture resulting URLs."
+    )(analyze_and_capture_urls)
 
     # === Nuclei Agent ===
-    nuclei_agent = ConversableAgent(
+    nuclei_agent = deferred(ConversableAgent(
         name="Nuclei-Scanner",
         system_message="""
         You're a vulnerability scanning agent using Nuclei.
@@ -51,20 +70,22 @@ def create_vuln_team(llm_config, interaction_mode):
         ```
 
         """,
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode
-    )
+    ), llm_config)
 
     # === Command Checker ===
-    checker = ConversableAgent(
+    checker = deferred(ConversableAgent(
         name="Command-Checker",
         system_message="You validate shell commands, ensuring output redirection to .txt files.",
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode=interaction_mode
-    )
+    ), llm_config)
+    attach_local_validator(checker)
 
     # === Code Executor ===
-    executor = LocalCommandLineCodeExecutor(timeout=3600, work_dir=".")
+    executor = create_code_executor(executor_mode, timeout=3600, work_dir=".")
+    executor = with_checkpoint(with_result_cache(executor, result_cache), checkpoint)
     code_executor = AssistantAgent(
         name="Code-Executor",
         llm_config=False,
@@ -73,29 +94,35 @@ def create_vuln_team(llm_config, interaction_mode):
     )
 
     # === File Reader ===
-    file_reader = AssistantAgent(
+    file_reader = deferred(AssistantAgent(
         name="File-Reader",
-        system_message="Reads scanner output files and returns their content.",
-        llm_config=llm_config,
+        system_message="Reads scanner output files and returns their content. Prefer read_findings for nmap/gobuster/whatweb/nuclei results; use read_file for anything else.",
+        llm_config=False,
         human_input_mode="NEVER"
-    )
-    file_reader.register_for_llm(
+    ), llm_config)
+    register_llm_tool(
+        file_reader,
         name="read_file",
-        description="Read a scanner output file"
+        description="Read a scanner output file (paged: offset/limit bytes, start_line/end_line, tail lines, regex pattern)"
     )(read_file)
     file_reader.register_for_execution(
         name="read_file",
-        description="Read a scanner output file"
+        description="Read a scanner output file (paged: offset/limit bytes, start_line/end_line, tail lines, regex pattern)"
     )(read_file)
+    register_llm_tool(file_reader, name="read_findings", description="Query parsed scan records (ports, paths, technologies, nuclei hits) instead of raw files")(read_findings)
+    file_reader.register_for_execution(name="read_findings")(read_findings)
+    register_llm_tool(file_reader, name="query_findings", description="Indexed query over all findings by target, tool, severity, URL or kind")(query_findings)
+    file_reader.register_for_execution(name="query_findings")(query_findings)
 
     # === Report Writer ===
-    reporter = AssistantAgent(
+    reporter = deferred(AssistantAgent(
         name="Report-Writer",
         system_message="Summarizes scanner results into bullet points. Always call saving-report after writing.",
-        llm_config=llm_config,
+        llm_config=False,
         human_input_mode="ALWAYS"
-    )
-    reporter.register_for_llm(
+    ), llm_config)
+    register_llm_tool(
+        reporter,
         name="saving-report",
         description="Save a scanner report"
     )(save_report)
@@ -103,16 +130,20 @@ def create_vuln_team(llm_config, interaction_mode):
         name="saving-report",
         description="Save a scanner report"
     )(save_report)
+    register_llm_tool(reporter, name="query_findings", description="Indexed query over all findings by target, tool, severity, URL or kind")(query_findings)
+    reporter.register_for_execution(name="query_findings")(query_findings)
 
     # === User Proxy ===
-    user_proxy = UserProxyAgent(
+    user_proxy = deferred(UserProxyAgent(
         name="User-Proxy",
         system_message="A human analyst supervising the scan. Approve commands before execution.",
         is_termination_msg=lambda msg: "TERMINATE" in msg["content"],
         code_execution_config={"work_dir": ".", "use_docker": False},
         human_input_mode=interaction_mode,
-        llm_config=llm_config
-    )
+        llm_config=False
+    ), llm_config)
+    if executor_mode == "background":
+        register_job_tools(file_reader, user_proxy)
 
     # Collect all agents
     agents = [
@@ -133,8 +164,15 @@ def create_vuln_team(llm_config, interaction_mode):
             "role": "user",
             "content": "Please provide the target base URL to extract parameterized URLs."
         }],
-        max_round=100
+        max_round=100,
+        speaker_selection_method=WorkflowSpeakerSelector(
+            steps=[param_agent, file_reader, nuclei_agent, reporter],
+            checker=checker, approver=user_proxy, executor=code_executor, reader=file_reader,
+        ),
     )
+    attach_history_compaction(vuln_team.agents)
+    if checkpoint is not None:
+        checkpoint.track(vuln_team)
 
     # Manager to orchestrate the flow
     manager = GroupChatManager(
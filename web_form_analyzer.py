@@ -1,49 +1,51 @@
 #web_form_analyzer.py
+import asyncio
+import json
 import os
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
-from autogen.agentchat import ConversableAgent
+import threading
+import time
+from typing import List
+from urllib.parse import urljoin
+from browser_pool import get_browser_pool, origin_of
+from session_cache import header_cookies, load_session, save_session, save_session_async
+from url_store import captured_urls
 
-HEADER_FILE = "header.txt"
-LOG_FILE = "captured_urls.txt"
+LOGIN_FORM = "form[action*='login.php']"
+FILLABLE_TYPES = ["text","hidden","search","email","url","number","password"]
+BATCH_CONCURRENCY = 5
 
 def analyze_and_capture_url(base_url: str) -> str:
     """
     Mở trang bằng Playwright, load cookie, tự login (nếu cần),
     auto-fill form (text/hidden/select), submit, lưu kết quả vào file và trả về page.url sau cùng.
+    Browser và context theo origin được giữ lại trong BrowserPool, nên mỗi lần gọi chỉ tốn một lần điều hướng trang.
+    Session sau khi login được lưu theo origin (session_cache), nên chỉ login lại khi gặp form login.
     """
-    with sync_playwright() as pw:
-        browser = pw.chromium.launch(headless=True)
-        context = browser.new_context()
-        # 1. Load cookie nếu có
-        if os.path.exists(HEADER_FILE):
-            raw = open(HEADER_FILE, "r", encoding="utf-8").read().strip()
-            if raw.lower().startswith("cookie:"):
-                raw = raw.split("Cookie:", 1)[1].strip()
-            cookies = []
-            for part in raw.split(";"):
-                part = part.strip()
-                if "=" not in part:
-                    continue
-                name, val = part.split("=", 1)
-                cookies.append({
-                    'name': name.strip(),
-                    'value': val.strip(),
-                    'url': base_url
-                })
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+    state = load_session(base_url)
+
+    def setup(context):
+        # 1. Load cookie từ header.txt nếu chưa có session đã lưu
+        if not state:
+            cookies = header_cookies(base_url)
             if cookies:
                 context.add_cookies(cookies)
+
+    options = {"storage_state": state} if state else None
+    with get_browser_pool().page(base_url, setup=setup, context_options=options) as page:
         # 2. Mở page
-        page = context.new_page()
         try:
             page.goto(base_url, timeout=5000)
         except PlaywrightTimeoutError:
             pass
         # 3. Tự login DVWA nếu gặp form login
-        if page.query_selector("form[action*='login.php']"):
+        if page.query_selector(LOGIN_FORM):
             page.fill("input[name='username']", "admin")
             page.fill("input[name='password']", "password")
             page.click("input[type='submit']")
             page.wait_for_load_state("networkidle")
+            save_session(page.context, base_url)
             page.goto(base_url)
         # 4. Tìm và điền form
         form = page.query_selector("form")
@@ -52,7 +54,7 @@ def analyze_and_capture_url(base_url: str) -> str:
             for inp in form.query_selector_all("input[name]"):
                 typ = (inp.get_attribute("type") or "text").lower()
                 name = inp.get_attribute("name")
-                if typ in ["text","hidden","search","email","url","number","password"]:
+                if typ in FILLABLE_TYPES:
                     page.fill(f"input[name='{name}']", "1")
             # 4.2 Select dropdowns
             for sel in form.query_selector_all("select[name]"):
@@ -72,17 +74,173 @@ def analyze_and_capture_url(base_url: str) -> str:
                 pass
         # 6. Kết quả cuối cùng
         result_url = page.url
-        browser.close()
-    # 7. Lưu kết quả vào file (append)
+    # 7. Lưu kết quả vào file (bỏ trùng theo endpoint + tên tham số)
+    _store_captured_urls([result_url])
+    return result_url
+
+
+def _store_captured_urls(urls):
+    """Add URLs to captured_urls.txt unless the same endpoint with the same parameter names is already there."""
     try:
-        with open(LOG_FILE, "a", encoding="utf-8") as log:
-            log.write(result_url + "\n")
+        return captured_urls.add(urls)
     except Exception as e:
-        print(f"[!] Error writing to log file {LOG_FILE}: {e}")
-    return result_url
+        print(f"[!] Error writing to log file {captured_urls.path}: {e}")
+        return []
+
+
+def _expand_url_list(urls, base_url=""):
+    """
+    Turn tool input into absolute URLs. Each entry may be a URL, a path
+    (joined with base_url) or a file such as url_dvwa.txt / gobuster_scan.txt,
+    in which case the first token of every line is used.
+    """
+    if isinstance(urls, str):
+        urls = [urls]
+    if base_url and "://" not in base_url:
+        base_url = f"http://{base_url}"
+    entries = []
+    for item in urls:
+        item = item.strip()
+        if item and "://" not in item and os.path.isfile(item):
+            with open(item, "r", encoding="utf-8", errors="replace") as f:
+                entries.extend(line.split()[0] for line in f if line.strip() and not line.startswith("#"))
+        elif item:
+            entries.append(item)
+    expanded = []
+    for entry in entries:
+        if "://" not in entry:
+            if not base_url:
+                continue
+            entry = urljoin(base_url.rstrip("/") + "/", entry.lstrip("/"))
+        if entry not in expanded:
+            expanded.append(entry)
+    return expanded
+
+
+async def _capture_one_async(context, url, semaphore, login_lock):
+    from playwright.async_api import TimeoutError as AsyncPlaywrightTimeoutError
+
+    async with semaphore:
+        start = time.perf_counter()
+        page = await context.new_page()
+        try:
+            try:
+                await page.goto(url, timeout=5000)
+            except AsyncPlaywrightTimeoutError:
+                pass
+            if await page.query_selector(LOGIN_FORM):
+                # Pages share the context cookies, so only the first one through the lock logs in.
+                async with login_lock:
+                    await page.goto(url)
+                    if await page.query_selector(LOGIN_FORM):
+                        await page.fill("input[name='username']", "admin")
+                        await page.fill("input[name='password']", "password")
+                        await page.click("input[type='submit']")
+                        await page.wait_for_load_state("networkidle")
+                        await save_session_async(context, url)
+                        await page.goto(url)
+            form = await page.query_selector("form")
+            if form:
+                for inp in await form.query_selector_all("input[name]"):
+                    typ = (await inp.get_attribute("type") or "text").lower()
+                    name = await inp.get_attribute("name")
+                    if typ in FILLABLE_TYPES:
+                        await page.fill(f"input[name='{name}']", "1")
+                for sel in await form.query_selector_all("select[name]"):
+                    name = await sel.get_attribute("name")
+                    opts = await sel.query_selector_all("option[value]")
+                    if opts:
+                        await page.select_option(f"select[name='{name}']", await opts[0].get_attribute("value"))
+                btn = await form.query_selector("input[type='submit'],button[type='submit']")
+                if btn:
+                    await btn.click()
+                else:
+                    await page.evaluate("document.querySelector('form').submit()")
+                try:
+                    await page.wait_for_load_state("networkidle", timeout=3000)
+                except AsyncPlaywrightTimeoutError:
+                    pass
+            return {"url": url, "final_url": page.url, "seconds": round(time.perf_counter() - start, 3)}
+        except Exception as e:
+            return {"url": url, "final_url": None, "seconds": round(time.perf_counter() - start, 3), "error": str(e)}
+        finally:
+            await page.close()
+
+
+async def _analyze_urls_async(urls, concurrency):
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=True)
+        try:
+            contexts, locks = {}, {}
+            for url in urls:
+                origin = origin_of(url)
+                if origin not in contexts:
+                    state = load_session(url)
+                    if state:
+                        context = await browser.new_context(storage_state=state)
+                    else:
+                        context = await browser.new_context()
+                        cookies = header_cookies(url)
+                        if cookies:
+                            await context.add_cookies(cookies)
+                    contexts[origin] = context
+                    locks[origin] = asyncio.Lock()
+            semaphore = asyncio.Semaphore(max(1, concurrency))
+            return await asyncio.gather(*(
+                _capture_one_async(contexts[origin_of(url)], url, semaphore, locks[origin_of(url)])
+                for url in urls
+            ))
+        finally:
+            await browser.close()
+
+
+def _run_coroutine(coro):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # Called from inside an event loop (async chat): run on a helper thread instead.
+    box = {}
+
+    def runner():
+        try:
+            box["result"] = asyncio.run(coro)
+        except BaseException as e:
+            box["error"] = e
+
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+    if "error" in box:
+        raise box["error"]
+    return box["result"]
+
+
+def analyze_and_capture_urls(urls: List[str], base_url: str = "", concurrency: int = BATCH_CONCURRENCY) -> str:
+    """
+    Batch variant of analyze_and_capture_url on the Playwright async API.
+    `urls` may contain URLs, paths relative to base_url, or a wordlist/gobuster file path.
+    Drives up to `concurrency` pages at once and returns JSON with per-URL results and timing.
+    """
+    targets = _expand_url_list(urls, base_url)
+    if not targets:
+        return json.dumps({"error": "No URLs to analyze (relative paths need base_url)."})
+    start = time.perf_counter()
+    results = _run_coroutine(_analyze_urls_async(targets, concurrency))
+    _store_captured_urls([r["final_url"] for r in results if r.get("final_url")])
+    return json.dumps({
+        "count": len(results),
+        "concurrency": concurrency,
+        "total_seconds": round(time.perf_counter() - start, 3),
+        "results": results,
+    }, indent=2)
 
 
 def create_web_form_analyzer_agent(llm_config):
+    from autogen.agentchat import ConversableAgent
+
     agent = ConversableAgent(
         name="Web-Form-Analyzer",
         system_message=(
@@ -98,6 +256,10 @@ def create_web_form_analyzer_agent(llm_config):
         name="analyze_form_and_capture_url",
         description="Analyze a webpage form and capture resulting URL."
     )(analyze_and_capture_url)
+    agent.register_for_execution(
+        name="analyze_forms_and_capture_urls",
+        description="Analyze many webpages concurrently and capture the resulting URLs."
+    )(analyze_and_capture_urls)
     return agent
 
 if __name__ == "__main__":